@@ -0,0 +1,21 @@
+# Generated by Django 5.2.6 on 2026-10-16 13:20
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0004_receptionistprofile"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(
+                django.db.models.functions.text.Upper("email"),
+                name="accounts_user_email_upper_idx",
+            ),
+        ),
+    ]
@@ -6,6 +6,7 @@ import secrets
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models.functions import Upper
 from django.utils import timezone
 from django.db.models.signals import post_save
 from django.dispatch import receiver
@@ -20,6 +21,13 @@ class User(AbstractUser):
     display_name = models.CharField(max_length=150, blank=True, default="")
     avatar = models.ImageField(upload_to="avatars/", blank=True, null=True)
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # email__iexact (login by email, patient -> portal user) compiles
+            # to UPPER(email) = UPPER(%s) on PostgreSQL
+            models.Index(Upper("email"), name="accounts_user_email_upper_idx"),
+        ]
+
     def __str__(self) -> str:  # type: ignore[override]
         return self.display_name or self.get_full_name() or self.username
 
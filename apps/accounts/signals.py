@@ -1,11 +1,19 @@
+from django.conf import settings
 from django.contrib.auth.signals import (
     user_logged_in,
     user_logged_out,
     user_login_failed,
 )
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from apps.audit.utils import log_event
 
+# Cached staff/clinician pick-lists; dropped whenever a user changes.
+RECEPTION_CLINICIANS_CACHE_KEY = "reception:clinicians:v1"
+BOOKING_CLINICIANS_CACHE_KEY = "portal:book_clinicians:v1"
+STAFF_USER_CACHE_KEYS = (RECEPTION_CLINICIANS_CACHE_KEY, BOOKING_CLINICIANS_CACHE_KEY)
+
 
 @receiver(user_logged_in)
 def audit_login(sender, request, user, **kwargs):
@@ -24,3 +32,12 @@ def audit_login_failed(sender, credentials, request, **kwargs):
     #  record failed logins without attaching a user id.
     username = (credentials or {}).get("username", "")
     log_event(request, "auth.login_failed", "Auth", username)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def invalidate_staff_user_caches(sender, instance, update_fields=None, **kwargs):
+    #  last_login bumps on every login don't change any pick-list.
+    if update_fields and set(update_fields) <= {"last_login"}:
+        return
+    cache.delete_many(STAFF_USER_CACHE_KEYS)
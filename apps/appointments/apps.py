@@ -4,3 +4,6 @@ class AppointmentsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.appointments"
     label = "appointments"
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-16 14:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("appointments", "0004_appointment_reminder_24h_sent_at_and_more"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="appointment",
+            index=models.Index(
+                fields=["patient", "start", "id"], name="appt_patient_start_id_idx"
+            ),
+        ),
+        migrations.RemoveIndex(
+            model_name="appointment",
+            name="appointment_patient_de3304_idx",
+        ),
+    ]
@@ -47,7 +47,9 @@ class Appointment(models.Model):
             models.Index(fields=["end"]),
             models.Index(fields=["status"]),
             models.Index(fields=["clinician", "start"]),
-            models.Index(fields=["patient", "start"]),
+            # patient timelines; id makes the portal's (-start, -id) keyset
+            # order a plain backward scan
+            models.Index(fields=["patient", "start", "id"], name="appt_patient_start_id_idx"),
         ]
         constraints = [
             # Never allow end <= start (DB-level guard) — use condition= (Django 6+ safe)
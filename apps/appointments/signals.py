@@ -0,0 +1,35 @@
+import time
+
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Appointment, Availability
+
+# Short-lived free-slot grids, namespaced by a per-clinician version that is
+# bumped whenever that clinician's appointments or availability change.
+FREE_SLOTS_VERSION_KEY = "appointments:free_slots_version:{clinician_id}"
+FREE_SLOTS_TTL = 30
+
+
+def free_slots_cache_key(clinician_id, date_from, date_to, duration) -> str:
+    version = cache.get_or_set(
+        FREE_SLOTS_VERSION_KEY.format(clinician_id=clinician_id), time.time_ns, None
+    )
+    return (
+        f"appointments:free_slots:{clinician_id}:v{version}:"
+        f"{date_from.isoformat()}:{date_to.isoformat()}:{duration}"
+    )
+
+
+@receiver(post_save, sender=Appointment)
+@receiver(post_delete, sender=Appointment)
+@receiver(post_save, sender=Availability)
+@receiver(post_delete, sender=Availability)
+def invalidate_free_slots(sender, instance, **kwargs):
+    if instance.clinician_id:
+        cache.set(
+            FREE_SLOTS_VERSION_KEY.format(clinician_id=instance.clinician_id),
+            time.time_ns(),
+            None,
+        )
@@ -1,14 +1,35 @@
 # apps/appointments/ui.py
+import hashlib
+
 from django.contrib.auth.decorators import login_required
+from django.core.cache import cache
 from django.core.paginator import Paginator
 from django.db.models import Q
 from django.shortcuts import render
 from django.utils.dateparse import parse_datetime
 from django.utils.decorators import method_decorator
+from django.utils.functional import cached_property
 from django.views import View
 
 from .models import Appointment
 
+LIST_COUNT_TTL = 60
+
+
+class CachedCountPaginator(Paginator):
+    """
+    Paginator whose COUNT(*) is shared for a minute across requests with the
+    same filter. The total only drives the page links, so a slightly stale
+    number is fine, and it spares the full count on every page flip.
+    """
+
+    @cached_property
+    def count(self):
+        sql = str(self.object_list.query).encode()
+        key = "appointments:list_count:" + hashlib.md5(sql, usedforsecurity=False).hexdigest()
+        return cache.get_or_set(key, self.object_list.count, LIST_COUNT_TTL)
+
+
 @method_decorator(login_required, name="dispatch")
 class AppointmentsListView(View):
     template_full = "appointments/list.html"
@@ -40,7 +61,7 @@ class AppointmentsListView(View):
             qs = qs.filter(status=status)
 
         qs = qs.order_by("-start", "id")
-        paginator = Paginator(qs, 25)
+        paginator = CachedCountPaginator(qs, 25)
         page = paginator.get_page(page_num)
 
         ctx = {"q": q, "page": page, "date_from": df_raw or "", "date_to": dt_raw or "", "status": status or ""}
@@ -1,9 +1,11 @@
 # apps/appointments/ui_views.py
 from __future__ import annotations
 
+import functools
 from datetime import datetime, timedelta
 
 from django.contrib.auth.decorators import login_required
+from django.db import transaction
 from django.http import HttpResponseBadRequest, HttpResponse
 from django.shortcuts import get_object_or_404, render, redirect
 from django.utils import timezone
@@ -215,14 +217,14 @@ def create_from_slot(request):
 
     ser = AppointmentCreateSerializer(data=payload)
     ser.is_valid(raise_exception=True)
-    appt = ser.save()
+    with transaction.atomic():
+        appt = ser.save()
+        # Email/ICS once the row is committed; broker errors are logged.
+        transaction.on_commit(
+            functools.partial(send_appointment_email.delay, appt.id, "created"), robust=True
+        )
 
-    # Audit + email/ICS
     log_event(request, "appt.create.ui", "Appointment", appt.id)
-    try:
-        send_appointment_email.delay(appt.id, "created")
-    except Exception:
-        pass
 
     # Redirect to clinician consultation list
     redirect_url = reverse("clinicians_ui:consultations_all", args=[int(clinician_id)])
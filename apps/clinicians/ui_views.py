@@ -1,13 +1,15 @@
 # apps/clinicians/ui_views.py
 from __future__ import annotations
 
+import functools
 from datetime import datetime, timedelta
 
 from django.contrib import messages
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.core.exceptions import PermissionDenied
-from django.db.models import Q, Count
+from django.db import transaction
+from django.db.models import Q, Count, Window
 from django.http import HttpResponseBadRequest, HttpResponse
 from django.shortcuts import get_object_or_404, render, redirect
 from django.urls import reverse
@@ -49,6 +51,9 @@ from django.contrib.staticfiles import finders
 
 # ----------------------------- helpers ------------------------------------- #
 
+# tells the navbar badges to refetch (HX-Trigger response header)
+_HX_REFRESH_BADGES = '{"refresh-badges": true}'
+
 
 
 
@@ -177,9 +182,14 @@ def tests_table(request, pk):
         if date_to:
             qs = qs.filter(created_at__date__lte=date_to)
 
-        qs = qs.order_by("-created_at")
-        total = qs.count()
+        # COUNT(*) OVER () rides along on the page query: one filtered scan, not two
+        qs = qs.annotate(total_rows=Window(expression=Count("*"))).order_by("-created_at")
         rows = list(qs[offset: offset + limit])
+        if rows:
+            total = rows[0].total_rows
+        else:
+            # Past the last page (or no matches): fall back to a plain count
+            total = qs.count() if offset else 0
     except Exception:
         total = 0
         rows = []
@@ -498,14 +508,19 @@ def dm_thread(request, pk):
             is_read=False,
         ).update(is_read=True)
 
-        thread = (
-            Message.objects.filter(kind="dm")
-            .filter(
-                (Q(from_user_id=clinician.pk) & Q(to_user_id=p_user.pk)) |
-                (Q(from_user_id=p_user.pk) & Q(to_user_id=clinician.pk))
-            )
-            .order_by("id")[:200]
-        )
+        # One leg per direction, UNION ALL'd, so each seeks msg_dm_thread_idx
+        # instead of the planner picking one side of an OR and filtering the
+        # other. _dm_msg.html reads only these columns.
+        cols = ("id", "body", "from_user_id", "created_at")
+        sent = Message.objects.filter(kind="dm", from_user_id=clinician.pk, to_user_id=p_user.pk)
+        received = Message.objects.filter(kind="dm", from_user_id=p_user.pk, to_user_id=clinician.pk)
+        # newest 200 (a backward scan per leg), shown oldest first; past 200
+        # messages this keeps the latest history rather than the earliest
+        thread = list(
+            sent.order_by().values(*cols)
+            .union(received.order_by().values(*cols), all=True)
+            .order_by("-id")[:200]
+        )[::-1]
 
     resp = render(
         request,
@@ -513,7 +528,7 @@ def dm_thread(request, pk):
         {"msgs": thread, "patient": patient, "p_user": p_user, "clinician": clinician},
     )
     # tell navbar badge to refresh
-    resp["HX-Trigger"] = '{"refresh-badges": true}'
+    resp["HX-Trigger"] = _HX_REFRESH_BADGES
     return resp
 
 
@@ -552,7 +567,7 @@ def dm_send(request, pk):
         {"m": msg, "clinician": clinician, "is_me": is_me},
     )
     # tell navbar badge to refresh (in case we later count sent-but-unread on clinician side too)
-    resp["HX-Trigger"] = '{"refresh-badges": true}'
+    resp["HX-Trigger"] = _HX_REFRESH_BADGES
     return resp
 
 
@@ -583,11 +598,11 @@ def cancel_appt(request, pk, appt_pk):
             log_event(request, "appt.cancel.ui", "Appointment", appt.id)
         except Exception:
             pass
-        try:
-            from apps.appointments.tasks import send_appointment_email
-            send_appointment_email.delay(appt.id, "canceled")
-        except Exception:
-            pass
+        # Enqueue after commit; broker errors are logged, not raised.
+        from apps.appointments.tasks import send_appointment_email
+        transaction.on_commit(
+            functools.partial(send_appointment_email.delay, appt.id, "canceled"), robust=True
+        )
 
     # HTMX? return refreshed upcoming; else redirect to list
     if request.headers.get("HX-Request"):
@@ -902,6 +917,7 @@ def availability_delete(request, pk, avail_id):
 
     return redirect("clinicians_ui:availability_index", pk=pk)
 
+@functools.cache
 def _pick_confirmed_status():
     """
     Choose a valid non-null 'confirmed' status based on the model's choices.
@@ -932,6 +948,7 @@ def _pick_confirmed_status():
     return choices[0]
 
 
+@functools.cache
 def _pick_cancelled_status():
     """Choose a valid 'cancelled' value respecting choices if present."""
     try:
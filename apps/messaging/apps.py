@@ -3,3 +3,7 @@ from django.apps import AppConfig
 class MessagingConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.messaging"
+
+    def ready(self):
+        # import signal handlers so cached unread badges drop on new DMs.
+        from . import signals  # noqa: F401
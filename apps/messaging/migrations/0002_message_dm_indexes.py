@@ -0,0 +1,25 @@
+# Generated by Django 5.2.6 on 2026-10-16 11:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("messaging", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="message",
+            index=models.Index(
+                fields=["to_user", "kind", "is_read", "from_user"], name="msg_dm_inbox_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="message",
+            index=models.Index(
+                fields=["from_user", "to_user", "kind", "id"], name="msg_dm_thread_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-16 13:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("messaging", "0002_message_dm_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="message",
+            index=models.Index(
+                fields=["to_user", "kind", "-created_at"], name="msg_to_kind_recent_idx"
+            ),
+        ),
+    ]
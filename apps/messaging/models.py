@@ -14,3 +14,9 @@ class Message(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["to_user", "kind", "is_read", "from_user"], name="msg_dm_inbox_idx"),
+            models.Index(fields=["from_user", "to_user", "kind", "id"], name="msg_dm_thread_idx"),
+            # clinician inbox tab: newest messages of a kind for a recipient
+            models.Index(fields=["to_user", "kind", "-created_at"], name="msg_to_kind_recent_idx"),
+        ]
@@ -0,0 +1,20 @@
+from django.core.cache import cache
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import Message
+
+# Short-lived per-recipient unread DM badge totals (polled by the portal navbar).
+UNREAD_BADGE_CACHE_KEY = "messaging:unread_badge:{user_id}"
+UNREAD_BADGE_TTL = 5
+
+
+def unread_badge_cache_key(user_id) -> str:
+    return UNREAD_BADGE_CACHE_KEY.format(user_id=user_id)
+
+
+@receiver(post_save, sender=Message)
+def invalidate_unread_badge(sender, instance, created, **kwargs):
+    # a new DM bumps the recipient's badge
+    if created and instance.kind == "dm":
+        cache.delete(unread_badge_cache_key(instance.to_user_id))
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.6 on 2026-10-16 09:12
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+def create_trigram_index(apps, schema_editor):
+    # pg_trgm GIN index is PostgreSQL-only; SQLite dev databases skip it.
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS patients_trgm_idx "
+        "ON patients_patient USING GIN (search_blob gin_trgm_ops);"
+    )
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS patients_trgm_idx;")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("patients", "0003_patient_patients_pa_merged__567d2b_idx_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="patient",
+            name="search_blob",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=django.db.models.functions.text.Lower(
+                    django.db.models.functions.text.Concat(
+                        "family_name",
+                        models.Value(" "),
+                        "given_name",
+                        models.Value(" "),
+                        "email",
+                        models.Value(" "),
+                        "phone",
+                        models.Value(" "),
+                        "external_id",
+                    )
+                ),
+                output_field=models.TextField(),
+            ),
+        ),
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.6 on 2026-10-16 09:40
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("patients", "0004_patient_search_blob"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="patient",
+            name="label",
+            field=models.GeneratedField(
+                db_index=True,
+                db_persist=True,
+                expression=django.db.models.functions.text.Trim(
+                    django.db.models.functions.text.Concat(
+                        "family_name", models.Value(", "), "given_name"
+                    )
+                ),
+                output_field=models.CharField(max_length=255),
+            ),
+        ),
+    ]
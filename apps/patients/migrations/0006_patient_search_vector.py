@@ -0,0 +1,51 @@
+# Generated by Django 5.2.6 on 2026-10-16 10:05
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+SEARCH_COLUMNS = "family_name, given_name, email, phone, external_id"
+
+
+def create_search_vector_trigger(apps, schema_editor):
+    # tsvector trigger + GIN index are PostgreSQL-only; other backends keep NULL.
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(
+        "CREATE TRIGGER patients_search_vector_trg "
+        "BEFORE INSERT OR UPDATE ON patients_patient "
+        "FOR EACH ROW EXECUTE FUNCTION tsvector_update_trigger("
+        f"search_vector, 'pg_catalog.simple', {SEARCH_COLUMNS});"
+    )
+    # Backfill existing rows through the trigger.
+    schema_editor.execute("UPDATE patients_patient SET search_vector = NULL;")
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS patients_search_vector_idx "
+        "ON patients_patient USING GIN (search_vector);"
+    )
+
+
+def drop_search_vector_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS patients_search_vector_idx;")
+    schema_editor.execute(
+        "DROP TRIGGER IF EXISTS patients_search_vector_trg ON patients_patient;"
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("patients", "0005_patient_label"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="patient",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunPython(create_search_vector_trigger, drop_search_vector_trigger),
+    ]
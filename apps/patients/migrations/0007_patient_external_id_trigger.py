@@ -0,0 +1,50 @@
+# Generated by Django 5.2.6 on 2026-10-16 11:40
+
+from django.db import migrations
+
+
+def create_external_id_trigger(apps, schema_editor):
+    # PostgreSQL fills a blank external_id as PT-000123 during the INSERT, so
+    # the create views don't need a follow-up UPDATE. Other backends keep the
+    # UPDATE path in the views.
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(
+        """
+        CREATE OR REPLACE FUNCTION patients_fill_external_id() RETURNS trigger AS $$
+        BEGIN
+            IF NEW.external_id = '' THEN
+                NEW.external_id := 'PT-' || lpad(NEW.id::text, greatest(6, length(NEW.id::text)), '0');
+            END IF;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+        """
+    )
+    # Trigger names sort before patients_search_vector_trg, so the vector
+    # picks up the generated ID.
+    schema_editor.execute(
+        "CREATE TRIGGER patients_external_id_trg "
+        "BEFORE INSERT ON patients_patient "
+        "FOR EACH ROW EXECUTE FUNCTION patients_fill_external_id();"
+    )
+
+
+def drop_external_id_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(
+        "DROP TRIGGER IF EXISTS patients_external_id_trg ON patients_patient;"
+    )
+    schema_editor.execute("DROP FUNCTION IF EXISTS patients_fill_external_id();")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("patients", "0006_patient_search_vector"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_external_id_trigger, drop_external_id_trigger),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.6 on 2026-10-16 12:10
+
+from django.db import migrations
+from django.db.models.functions import Lower, Trim
+
+
+def lowercase_emails(apps, schema_editor):
+    Patient = apps.get_model("patients", "Patient")
+    Patient.objects.exclude(email="").update(email=Lower(Trim("email")))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("patients", "0007_patient_external_id_trigger"),
+    ]
+
+    operations = [
+        migrations.RunPython(lowercase_emails, migrations.RunPython.noop),
+    ]
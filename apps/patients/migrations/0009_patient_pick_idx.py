@@ -0,0 +1,21 @@
+# Generated by Django 5.2.6 on 2026-10-16 12:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("patients", "0008_normalize_patient_email"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="patient",
+            index=models.Index(
+                condition=models.Q(("is_active", True), ("merged_into__isnull", True)),
+                fields=["family_name", "given_name", "id"],
+                name="patient_pick_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.6 on 2026-10-16 14:20
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("patients", "0009_patient_pick_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="patient",
+            name="name_key",
+            field=models.GeneratedField(
+                db_index=True,
+                db_persist=True,
+                expression=django.db.models.functions.text.Concat(
+                    django.db.models.functions.text.Lower("given_name"),
+                    models.Value("|"),
+                    django.db.models.functions.text.Lower("family_name"),
+                ),
+                output_field=models.CharField(max_length=201),
+            ),
+        ),
+    ]
@@ -3,13 +3,57 @@ from __future__ import annotations
 from datetime import date
 from typing import Optional
 
-from django.db import models
-from django.db.models import Q, F
+from django.contrib.postgres.search import SearchQuery, SearchVectorField
+from django.db import connections, models
+from django.db.models import Q, F, Value
+from django.db.models.functions import Concat, Lower, Trim
 from django.utils import timezone
 
 
 # ------------ QuerySet / Manager helpers ------------ #
 
+def _search_terms(terms) -> list[str]:
+    """
+    Lowercase, strip and dedupe search terms, longest (most selective) first.
+    """
+    uniq = frozenset(t.strip().lower() for t in terms) - {""}
+    return sorted(uniq, key=lambda t: (-len(t), t))
+
+
+def name_search_q(terms, *, full_text: bool = False) -> Q:
+    """
+    AND of per-term matches against the patient search columns.
+
+    With full_text (PostgreSQL), purely alphabetic terms (names) are folded
+    into one prefix tsquery served by the search_vector GIN index; everything
+    else (emails, phones, IDs) is a substring probe on search_blob, served by
+    the pg_trgm GIN index. Otherwise search_blob is used for all terms.
+    """
+    cond = Q()
+    words = []
+    for t in _search_terms(terms):
+        if full_text and t.isalpha():
+            words.append(t)
+        else:
+            cond &= Q(search_blob__contains=t)
+    if words:
+        query = SearchQuery(
+            " & ".join(f"{w}:*" for w in words),
+            search_type="raw",
+            config="simple",
+        )
+        cond &= Q(search_vector=query)
+    return cond
+
+
+def patient_name_key(given_name: str, family_name: str) -> str:
+    """
+    Python side of Patient.name_key: exact-match lookups on both names
+    without per-row UPPER()/LOWER() calls.
+    """
+    return f"{(given_name or '').lower()}|{(family_name or '').lower()}"
+
+
 class PatientQuerySet(models.QuerySet):
     def active(self) -> "PatientQuerySet":
         return self.filter(is_active=True, merged_into__isnull=True)
@@ -28,17 +72,8 @@ class PatientQuerySet(models.QuerySet):
         text = (text or "").strip()
         if not text:
             return self
-        terms = text.split()
-        cond = Q()
-        for t in terms:
-            cond &= (
-                Q(given_name__icontains=t)
-                | Q(family_name__icontains=t)
-                | Q(phone__icontains=t)
-                | Q(email__icontains=t)
-                | Q(external_id__icontains=t)
-            )
-        return self.filter(cond)
+        full_text = connections[self.db].vendor == "postgresql"
+        return self.filter(name_search_q(text.split(), full_text=full_text))
 
 
 class PatientManager(models.Manager.from_queryset(PatientQuerySet)):  # type: ignore[misc]
@@ -77,6 +112,40 @@ class Patient(models.Model):
     )
     merged_at = models.DateTimeField(null=True, blank=True)
 
+    # --- Display label "Family, Given" (DB-maintained, indexed for ordering) ---
+    label = models.GeneratedField(
+        expression=Trim(Concat("family_name", Value(", "), "given_name")),
+        output_field=models.CharField(max_length=255),
+        db_persist=True,
+        db_index=True,
+    )
+
+    # --- Case-folded "given|family" key (DB-maintained, indexed for exact matches) ---
+    name_key = models.GeneratedField(
+        expression=Concat(Lower("given_name"), Value("|"), Lower("family_name")),
+        output_field=models.CharField(max_length=201),
+        db_persist=True,
+        db_index=True,
+    )
+
+    # --- Search (DB-maintained; trigram GIN-indexed on PostgreSQL, see 0004) ---
+    search_blob = models.GeneratedField(
+        expression=Lower(
+            Concat(
+                "family_name", Value(" "),
+                "given_name", Value(" "),
+                "email", Value(" "),
+                "phone", Value(" "),
+                "external_id",
+            )
+        ),
+        output_field=models.TextField(),
+        db_persist=True,
+    )
+    # Full-text vector over the same columns; kept current by a PostgreSQL
+    # trigger (see migration 0006). Stays NULL on other backends.
+    search_vector = SearchVectorField(null=True, editable=False)
+
     # --- Timestamps ---
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -95,6 +164,12 @@ class Patient(models.Model):
             models.Index(fields=["external_id"]),
             models.Index(fields=["family_name", "given_name", "date_of_birth"]),  # common dup key
             models.Index(fields=["merged_into"]),
+            # console picker: active, unmerged patients in name order
+            models.Index(
+                fields=["family_name", "given_name", "id"],
+                name="patient_pick_idx",
+                condition=Q(is_active=True, merged_into__isnull=True),
+            ),
         ]
         constraints = [
             models.CheckConstraint(
@@ -142,6 +217,9 @@ class Patient(models.Model):
                 if value is None:
                     setattr(self, field_name, "")
 
+        # Stored lowercased so email lookups can be exact (plain btree index).
+        self.email = self.email.strip().lower()
+
         super().save(*args, **kwargs)
 
      
@@ -8,7 +8,7 @@ from django.apps import apps
 from django.db import transaction
 from django.db.models import Q, QuerySet
 
-from .models import Patient
+from .models import Patient, patient_name_key
 
 
 # ---- Normalizers (kept) ----
@@ -54,13 +54,12 @@ def find_possible_duplicates(
 
     q = Q()
     if email_n:
-        q |= Q(email__iexact=email_n)
+        q |= Q(email=email_n)  # stored lowercased by Patient.save()
     if phone_n:
         q |= Q(phone__iexact=phone_n)
     if family_name and given_name and dob:
         q |= (
-            Q(family_name__iexact=family_name.strip())
-            & Q(given_name__iexact=given_name.strip())
+            Q(name_key=patient_name_key(given_name.strip(), family_name.strip()))
             & Q(date_of_birth=dob)
         )
     return Patient.objects.filter(q, is_active=True, merged_into__isnull=True).distinct()
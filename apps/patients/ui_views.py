@@ -1,18 +1,23 @@
 # apps/patients/ui_views.py
 from __future__ import annotations
 
+import csv
+import io
 from datetime import date
 from urllib.parse import urlencode
 
 from django.conf import settings
+from django.contrib.postgres.search import TrigramSimilarity
 from django.contrib import messages
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.tokens import PasswordResetTokenGenerator
+from django.core.cache import cache
 from django.core.mail import EmailMultiAlternatives
-from django.db.models import Q, Value, CharField, F
-from django.db.models.functions import Concat, Coalesce, Trim
+from django.db import connection, transaction
+from django.db.models import Case, Q, Value, When
 from django.http import (
+    Http404,
     HttpRequest,
     HttpResponseBadRequest,
     HttpResponseForbidden,
@@ -27,11 +32,12 @@ from django.utils.http import urlsafe_base64_encode
 from django.utils.text import slugify
 from django.apps import apps
 
-from .models import Patient
+from .models import Patient, name_search_q
 from .services import merge_into
 
 # RBAC helpers (plain-Django)
 from apps.rbac.utils import has_role
+from apps.accounts.signals import RECEPTION_CLINICIANS_CACHE_KEY
 
 
 # -------------------------
@@ -39,6 +45,17 @@ from apps.rbac.utils import has_role
 # -------------------------
 
 
+def _absolute_url(request: HttpRequest, path: str) -> str:
+    """
+    Absolute URL for `path`: prefix with settings.SITE_BASE_URL when set,
+    otherwise fall back to the request's scheme/host.
+    """
+    base = getattr(settings, "SITE_BASE_URL", "")
+    if base:
+        return f"{base}{path}"
+    return request.build_absolute_uri(path)
+
+
 def _build_portal_login_link(request: HttpRequest, user) -> str | None:
     """
     Build an absolute URL to a password-reset / set-password page for this user.
@@ -62,7 +79,7 @@ def _build_portal_login_link(request: HttpRequest, user) -> str | None:
     for name, kwargs in candidates:
         try:
             path = reverse(name, kwargs=kwargs)
-            return request.build_absolute_uri(path)
+            return _absolute_url(request, path)
         except NoReverseMatch:
             continue
 
@@ -95,17 +112,58 @@ def _int_or_none(v):
         return None
 
 
+# Columns the patient list/search templates read; skips addresses,
+# timestamps and the generated search columns.
+_LIST_FIELDS = (
+    "id",
+    "given_name",
+    "family_name",
+    "email",
+    "phone",
+    "external_id",
+    "date_of_birth",
+    "is_active",
+)
+
+
+# Columns the compact picker renders.
+_PICK_FIELDS = ("id", "given_name", "family_name", "date_of_birth", "email")
+
+# NOT is_active, evaluated by the database in an UPDATE
+_TOGGLED_IS_ACTIVE = Case(
+    When(is_active=True, then=Value(False)),
+    default=Value(True),
+)
+
+# patients_search orderings: by stored label, or by trigram rank (PostgreSQL)
+_SEARCH_ORDER = ("label", "id")
+_RANKED_SEARCH_ORDER = ("-sim", "label", "id")
+
+
+def _is_postgres() -> bool:
+    return connection.vendor == "postgresql"
+
+
+def _assign_external_id(patient: Patient) -> None:
+    """
+    Give a new patient its human-readable ID (PT-000123). PostgreSQL already
+    wrote it in the INSERT via a trigger (migration 0008), so just mirror the
+    value; other backends need the follow-up UPDATE.
+    """
+    if patient.external_id:
+        return
+    patient.external_id = f"PT-{patient.pk:06d}"
+    if _is_postgres():
+        return
+    try:
+        patient.save(update_fields=["external_id"])
+    except Exception:
+        pass
+
+
 def _name_q(terms: list[str]) -> Q:
-    cond = Q()
-    for t in terms:
-        cond &= (
-            Q(family_name__icontains=t)
-            | Q(given_name__icontains=t)
-            | Q(email__icontains=t)
-            | Q(phone__icontains=t)
-            | Q(external_id__icontains=t)
-        )
-    return cond
+    """AND of per-term matches; see Patient name_search_q()."""
+    return name_search_q(terms, full_text=_is_postgres())
 
 
 def _unique_username_from_email_or_name(
@@ -136,14 +194,9 @@ def _assign_patient_to_clinician(patient: Patient, clinician) -> None:
     """
 
     # Handle FK/field `primary_clinician` if present
-    if hasattr(patient, "primary_clinician"):
-        try:
-            current = patient.primary_clinician
-        except Exception:
-            # Covers cases like reverse one-to-one RelatedObjectDoesNotExist
-            current = None
-
-        if not current:
+    if _PATIENT_HAS_PRIMARY_CLINICIAN:
+        # FK column check: no SELECT for the related user
+        if not patient.primary_clinician_id:
             try:
                 patient.primary_clinician = clinician
                 patient.save(update_fields=["primary_clinician"])
@@ -157,7 +210,7 @@ def _assign_patient_to_clinician(patient: Patient, clinician) -> None:
                     pass
 
     # If you also have an M2M `clinicians` field, add the clinician there
-    if hasattr(patient, "clinicians"):
+    if _PATIENT_HAS_CLINICIANS_M2M:
         try:
             patient.clinicians.add(clinician)
         except Exception:
@@ -166,6 +219,23 @@ def _assign_patient_to_clinician(patient: Patient, clinician) -> None:
 
 
 
+def _get_clinicians_cached() -> list:
+    """
+    Active staff users for the reception "assign clinician" dropdown.
+    Cached for 60s; accounts.signals drops the entry when a user changes.
+    """
+    User = get_user_model()
+    return cache.get_or_set(
+        RECEPTION_CLINICIANS_CACHE_KEY,
+        lambda: list(
+            User.objects.filter(is_staff=True, is_active=True)
+            .only("id", "username", "first_name", "last_name")
+            .order_by("first_name", "last_name", "id")
+        ),
+        60,
+    )
+
+
 def _is_htmx(request: HttpRequest) -> bool:
     return request.headers.get("HX-Request") == "true"
 
@@ -175,24 +245,13 @@ def _wants_json(request: HttpRequest) -> bool:
     Detect if this is an AJAX/HTMX/XHR-style call that expects a non-HTML response.
     We want this to be TRUE for the patient list "Login link" button.
     """
-    # HTMX
-    if request.headers.get("HX-Request") == "true":
-        return True
-
-    # Classic XHR / many JS libs
-    if request.headers.get("X-Requested-With") == "XMLHttpRequest":
+    h = request.headers.get
+    # HTMX / classic XHR (many JS libs)
+    if h("HX-Request") == "true" or h("X-Requested-With") == "XMLHttpRequest":
         return True
 
-    # Fetch with explicit JSON accept
-    accept = request.headers.get("Accept", "")
-    if "application/json" in accept and "text/html" not in accept:
-        return True
-
-    # Many fetch() calls send "text/html,*/*" - treat non-HTML-only as JSON-ish
-    if "text/html" not in accept:
-        return True
-
-    return False
+    # fetch() with JSON or */* accept: anything that doesn't ask for HTML
+    return "text/html" not in h("Accept", "")
 
 
 # -------------------------
@@ -238,7 +297,7 @@ def _send_portal_password_reset_email(
             # Portal URLs not wired yet – treat as failure but don't crash.
             return False
 
-        reset_url = request.build_absolute_uri(path)
+        reset_url = _absolute_url(request, path)
 
         subject = "Reset your Nouvel patient portal password"
         html_body = render(
@@ -294,7 +353,7 @@ def _send_portal_invite_email(request: HttpRequest, user, email: str):
             # No suitable URL configured yet – skip sending invite instead of crashing
             return
 
-    invite_url = request.build_absolute_uri(path)
+    invite_url = _absolute_url(request, path)
 
     subject = "Access your Nouvel patient portal"
     html_body = render(
@@ -318,7 +377,7 @@ def _send_portal_invite_email(request: HttpRequest, user, email: str):
 
 
 # -------------------------
-# Link model (optional)
+# Link model (optional) + model capability flags
 # -------------------------
 try:
     Link = apps.get_model("core", "Link")
@@ -326,6 +385,43 @@ except LookupError:
     Link = None
 
 
+def _field_names(model) -> frozenset[str]:
+    try:
+        return frozenset(f.name for f in model._meta.get_fields())
+    except Exception:
+        return frozenset()
+
+
+# Models are fixed after import, so resolve optional fields once here
+# instead of hasattr() probes on every call.
+_LINK_FIELDS = _field_names(Link) if Link is not None else frozenset()
+_LINK_HAS_PATIENT = "patient" in _LINK_FIELDS
+_LINK_HAS_CLINICIAN = "clinician" in _LINK_FIELDS
+
+_PATIENT_FIELDS = _field_names(Patient)
+_PATIENT_HAS_PRIMARY_CLINICIAN = "primary_clinician" in _PATIENT_FIELDS
+_PATIENT_HAS_CLINICIANS_M2M = "clinicians" in _PATIENT_FIELDS
+_PATIENT_HAS_USER = "user" in _PATIENT_FIELDS
+
+
+# Link(...) kwargs for a patient-bound link, specialised once for the schema.
+if _LINK_HAS_CLINICIAN and _PATIENT_HAS_PRIMARY_CLINICIAN:
+
+    def _patient_link_kwargs(patient: Patient, slug: str, url: str) -> dict:
+        return {
+            "kind": "patient-portal",
+            "slug": slug,
+            "url": url,
+            "patient": patient,
+            "clinician_id": patient.primary_clinician_id,
+        }
+
+else:
+
+    def _patient_link_kwargs(patient: Patient, slug: str, url: str) -> dict:
+        return {"kind": "patient-portal", "slug": slug, "url": url, "patient": patient}
+
+
 def _ensure_patient_links(patient: Patient):
     """
     Ensure we have stable links for:
@@ -346,12 +442,19 @@ def _ensure_patient_links(patient: Patient):
         "portal_documents": reverse("portal_ui:documents"),
     }
 
-    for key, url in mapping.items():
-        Link.objects.get_or_create(
-            kind="patient-portal",
-            slug=key,
-            defaults={"url": url},
+    # One SELECT for the existing slugs + at most one INSERT for the rest
+    existing = set(
+        Link.objects.filter(kind="patient-portal", slug__in=mapping).values_list(
+            "slug", flat=True
         )
+    )
+    missing = [
+        Link(kind="patient-portal", slug=key, url=url)
+        for key, url in mapping.items()
+        if key not in existing
+    ]
+    if missing:
+        Link.objects.bulk_create(missing, ignore_conflicts=True)
 
 
 def _ensure_patient_specific_links(patient: Patient):
@@ -360,31 +463,32 @@ def _ensure_patient_specific_links(patient: Patient):
 
     If there is no Link model or it doesn’t have a patient FK, this is a no-op.
     """
-    if Link is None:
-        return
-
-    if not hasattr(Link, "patient"):
+    if not _LINK_HAS_PATIENT:
         return
 
     mapping = {
         "portal_patient_home": reverse("portal_ui:home"),
     }
 
-    for key, url in mapping.items():
-        kwargs = {
-            "kind": "patient-portal",
-            "slug": key,
-            "url": url,
-            "patient": patient,
-        }
-        if hasattr(Link, "clinician") and getattr(
-            patient,
-            "primary_clinician",
-            None,
-        ):
-            kwargs["clinician"] = patient.primary_clinician
-        Link.objects.get_or_create(**kwargs)
-        return
+    existing = set(
+        Link.objects.filter(
+            kind="patient-portal",
+            patient=patient,
+            slug__in=mapping,
+        ).values_list("slug", flat=True)
+    )
+    missing = [
+        Link(**_patient_link_kwargs(patient, key, url))
+        for key, url in mapping.items()
+        if key not in existing
+    ]
+    if missing:
+        Link.objects.bulk_create(missing, ignore_conflicts=True)
+
+
+# Role names accepted by the gates below (has_role caches the user's roles per request)
+_RECEPTION_ROLES = ("reception", "receptionist", "frontdesk")
+_CONSOLE_ROLES = _RECEPTION_ROLES + ("clinician", "clinicians")
 
 
 def _require_reception(request) -> bool:
@@ -401,7 +505,7 @@ def _require_reception(request) -> bool:
     if getattr(user, "is_superuser", False):
         return True
 
-    if has_role(user, "reception", "receptionist", "frontdesk"):
+    if has_role(user, *_RECEPTION_ROLES):
         return True
 
     return getattr(user, "is_staff", False)
@@ -427,14 +531,7 @@ def _require_console_access(user) -> bool:
     if getattr(user, "is_staff", False):
         return True
 
-    if has_role(
-        user,
-        "reception",
-        "receptionist",
-        "frontdesk",
-        "clinician",
-        "clinicians",
-    ):
+    if has_role(user, *_CONSOLE_ROLES):
         return True
 
     return False
@@ -461,7 +558,7 @@ def patients_home(request: HttpRequest):
     base = Patient.objects.filter(is_active=True, merged_into__isnull=True)
     if q:
         base = base.filter(_name_q(q.split()))
-    initial = base.order_by("family_name", "given_name", "id")[:50]
+    initial = base.only(*_LIST_FIELDS).order_by("family_name", "given_name", "id")[:50]
     return render(
         request,
         "patients/console.html",
@@ -482,28 +579,18 @@ def patients_search(request: HttpRequest):
     limit = int(request.GET.get("limit") or 40)
 
     patients = Patient.objects.all()
+    ordering = _SEARCH_ORDER
 
     if q:
-        patients = patients.filter(
-            Q(family_name__icontains=q)
-            | Q(given_name__icontains=q)
-            | Q(email__icontains=q)
-            | Q(phone__icontains=q)
-        )
+        patients = patients.filter(_name_q(q.split()))
+        if _is_postgres():
+            # Best matches first; names break ties.
+            patients = patients.annotate(sim=TrigramSimilarity("search_blob", q.lower()))
+            ordering = _RANKED_SEARCH_ORDER
 
-    fam = Coalesce(F("family_name"), Value(""))
-    giv = Coalesce(F("given_name"), Value(""))
-    comma = Value(", ")
-
-    patients = patients.annotate(
-        label=Trim(
-            Coalesce(
-                Concat(fam, comma, giv, output_field=CharField()),
-                Concat(fam, giv, output_field=CharField()),
-                output_field=CharField(),
-            )
-        )
-    ).order_by("family_name", "given_name")[:limit]
+    # `label` is a stored generated column, so no per-row string work here.
+    # Plain dicts: both result templates only read a few columns.
+    patients = patients.order_by(*ordering).values(*_LIST_FIELDS)[:limit]
 
     ctx = {"patients": patients}
 
@@ -577,17 +664,11 @@ def patients_create(request: HttpRequest):
             region=region,
             postal_code=postal_code,
             country=country,
-            external_id="",  # placeholder; will be overwritten below
+            external_id="",  # placeholder; filled with PT-000123 below
             is_active=True,
         )
 
-        # Generate human-readable ID after we have a PK
-        try:
-            if not getattr(patient, "external_id", None):
-                patient.external_id = f"PT-{patient.pk:06d}"
-                patient.save(update_fields=["external_id"])
-        except Exception:
-            pass
+        _assign_external_id(patient)
 
         _ensure_patient_links(patient)
         _ensure_patient_specific_links(patient)
@@ -611,7 +692,7 @@ def patients_create(request: HttpRequest):
             else:
                 # Existing user:
                 # 1) Link Patient -> User if model has FK
-                if hasattr(patient, "user_id") and not patient.user_id:
+                if _PATIENT_HAS_USER and not patient.user_id:
                     try:
                         patient.user = user
                         patient.save(update_fields=["user"])
@@ -908,12 +989,14 @@ def patients_deactivate(request: HttpRequest, pk: int):
     if not _require_console_access(request.user):
         return HttpResponseForbidden("Not allowed.")
 
-    patient = get_object_or_404(Patient, pk=pk)
     if request.method == "POST":
-        patient.is_active = False
-        patient.save(update_fields=["is_active"])
+        # Single UPDATE; no need to load the row first
+        if not Patient.objects.filter(pk=pk).update(is_active=False):
+            raise Http404("No Patient matches the given query.")
         messages.success(request, "Patient deactivated.")
         return redirect("patients_ui:patients_home")
+
+    patient = get_object_or_404(Patient, pk=pk)
     return render(request, "patients/deactivate.html", {"patient": patient})
 
 
@@ -932,7 +1015,7 @@ def reception_patients_list(request: HttpRequest):
     if q:
         base = base.filter(_name_q(q.split()))
 
-    patients = base.order_by("family_name", "given_name", "id")[:200]
+    patients = base.only(*_LIST_FIELDS).order_by("family_name", "given_name", "id")[:200]
     ctx = {"patients": patients, "q": q}
 
     if _is_htmx(request):
@@ -954,12 +1037,12 @@ def reception_patient_toggle_active(request: HttpRequest, pk: int):
     if request.method != "POST":
         return HttpResponseBadRequest("POST only")
 
-    p = get_object_or_404(Patient, pk=pk)
-    p.is_active = not p.is_active
-    p.save(update_fields=["is_active"])
+    # Flip is_active in one UPDATE instead of SELECT + save()
+    if not Patient.objects.filter(pk=pk).update(is_active=_TOGGLED_IS_ACTIVE):
+        raise Http404("No Patient matches the given query.")
 
     base = Patient.objects.filter(is_active=True, merged_into__isnull=True)
-    patients = base.order_by("family_name", "given_name", "id")[:200]
+    patients = base.only(*_LIST_FIELDS).order_by("family_name", "given_name", "id")[:200]
     ctx = {"patients": patients, "q": ""}
 
     if _is_htmx(request):
@@ -1022,14 +1105,10 @@ def reception_patient_create(request: HttpRequest):
 
         if errors:
             messages.error(request, " ".join(errors))
-            clinicians = User.objects.filter(
-                is_staff=True,
-                is_active=True,
-            ).order_by("first_name", "last_name", "id")
             return render(
                 request,
                 "reception/patient_create.html",
-                {"clinicians": clinicians, "form": request.POST},
+                {"clinicians": _get_clinicians_cached(), "form": request.POST},
             )
 
         # IMPORTANT: external_id placeholder for NOT NULL column
@@ -1045,17 +1124,11 @@ def reception_patient_create(request: HttpRequest):
             region=region,
             postal_code=postal_code,
             country=country,
-            external_id="",  # placeholder
+            external_id="",  # placeholder; filled with PT-000123 below
             is_active=True,
         )
 
-        # Human-readable external ID
-        try:
-            if not getattr(patient, "external_id", None):
-                patient.external_id = f"PT-{patient.pk:06d}"
-                patient.save(update_fields=["external_id"])
-        except Exception:
-            pass
+        _assign_external_id(patient)
 
         if clinician:
             _assign_patient_to_clinician(patient, clinician)
@@ -1063,14 +1136,100 @@ def reception_patient_create(request: HttpRequest):
         messages.success(request, "Patient created and assigned to clinician.")
         return redirect("patients_ui:reception_patients_list")
 
-    clinicians = User.objects.filter(
-        is_staff=True,
-        is_active=True,
-    ).order_by("first_name", "last_name", "id")
     return render(
         request,
         "reception/patient_create.html",
-        {"clinicians": clinicians},
+        {"clinicians": _get_clinicians_cached()},
+    )
+
+
+# Columns accepted by the bulk import (CSV header row); names are required.
+_BULK_PATIENT_COLUMNS = (
+    "given_name",
+    "family_name",
+    "email",
+    "phone",
+    "date_of_birth",
+    "sex",
+    "address_line",
+    "city",
+    "region",
+    "postal_code",
+    "country",
+)
+
+
+@login_required
+def reception_patient_bulk_create(request: HttpRequest):
+    """
+    Reception bulk import: POST a CSV (upload `file`, or text in `csv`) with a
+    header row using the _BULK_PATIENT_COLUMNS names. All valid rows are
+    inserted in batched multi-row INSERTs inside one transaction; invalid
+    rows are reported back and skipped. Optional `clinician_id` assigns
+    every new patient to that clinician.
+    """
+    if not _require_reception(request):
+        return JsonResponse({"ok": False, "error": "Not allowed."}, status=403)
+    if request.method != "POST":
+        return HttpResponseBadRequest("POST only")
+
+    upload = request.FILES.get("file")
+    try:
+        text = upload.read().decode("utf-8-sig") if upload else (request.POST.get("csv") or "")
+    except UnicodeDecodeError:
+        return JsonResponse({"ok": False, "error": "CSV must be UTF-8."}, status=400)
+    if not text.strip():
+        return JsonResponse({"ok": False, "error": "No rows."}, status=400)
+
+    clinician = None
+    clinician_id = (request.POST.get("clinician_id") or "").strip()
+    if clinician_id:
+        User = get_user_model()
+        try:
+            clinician = User.objects.get(pk=int(clinician_id), is_active=True, is_staff=True)
+        except (User.DoesNotExist, ValueError):
+            return JsonResponse({"ok": False, "error": "Selected clinician is invalid."}, status=400)
+
+    objs = []
+    errors = []
+    # row 1 is the header
+    for line_no, row in enumerate(csv.DictReader(io.StringIO(text)), start=2):
+        data = {c: (row.get(c) or "").strip() for c in _BULK_PATIENT_COLUMNS}
+        if not data["given_name"] or not data["family_name"]:
+            errors.append({"row": line_no, "error": "Given and family name are required."})
+            continue
+        dob = None
+        if data["date_of_birth"]:
+            try:
+                dob = date.fromisoformat(data["date_of_birth"])
+            except ValueError:
+                errors.append({"row": line_no, "error": "Date of birth format should be YYYY-MM-DD."})
+                continue
+        data["date_of_birth"] = dob
+        # bulk_create skips Patient.save(), so normalize email here
+        data["email"] = data["email"].lower()
+        objs.append(Patient(**data, external_id="", is_active=True))
+
+    if objs:
+        with transaction.atomic():
+            Patient.objects.bulk_create(objs, batch_size=500)
+            # PostgreSQL fills external_id in the INSERT (trigger, migration
+            # 0008); elsewhere set it in one batched UPDATE when pks came back.
+            for p in objs:
+                if p.pk is not None and not p.external_id:
+                    p.external_id = f"PT-{p.pk:06d}"
+            if not _is_postgres():
+                Patient.objects.bulk_update(
+                    [p for p in objs if p.pk is not None], ["external_id"], batch_size=1000
+                )
+            if clinician:
+                for p in objs:
+                    if p.pk is not None:
+                        _assign_patient_to_clinician(p, clinician)
+
+    return JsonResponse(
+        {"ok": not errors, "created": len(objs), "errors": errors},
+        status=200 if objs or not errors else 400,
     )
 
 
@@ -1122,7 +1281,8 @@ def pick_list(request: HttpRequest):
     if q:
         patients = patients.filter(_name_q(q.split()))
 
-    patients = patients.order_by("family_name", "given_name", "id")[:limit]
+    # Ordering matches patient_pick_idx (partial on the filter above).
+    patients = patients.only(*_PICK_FIELDS).order_by("family_name", "given_name", "id")[:limit]
 
     return render(
         request,
@@ -1,6 +1,5 @@
 # apps/patients/views.py
 from django.shortcuts import render
-from django.db.models import Q
 from .models import Patient
 
 
@@ -22,22 +21,14 @@ def search(request):
     q = (request.GET.get("q") or "").strip()
     limit = _int_param(request.GET.get("limit"), default=10, maximum=50)
 
-    queryset = Patient.objects.filter(is_active=True, merged_into__isnull=True)
+    # name_search probes the lowercased search_blob column per term, which the
+    # pg_trgm GIN index serves on Postgres.
+    queryset = Patient.objects.active().name_search(q)
 
-    if q:
-        terms = q.split()
-        cond = Q()
-        for t in terms:
-            cond &= (
-                Q(given_name__icontains=t)
-                | Q(family_name__icontains=t)
-                | Q(phone__icontains=t)
-                | Q(email__icontains=t)
-                | Q(external_id__icontains=t)
-            )
-        queryset = queryset.filter(cond)
-
-    patients = queryset.order_by("family_name", "given_name", "id")[:limit]
+    patients = (
+        queryset.only("id", "family_name", "given_name", "email", "phone", "external_id", "is_active")
+        .order_by("family_name", "given_name", "id")[:limit]
+    )
 
     return render(request, "patients/_search_results.html", {
         "patients": patients,
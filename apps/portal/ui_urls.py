@@ -1,8 +1,6 @@
 # apps/portal/ui_urls.py
 from django.urls import path
 from . import ui_views as v
-from . import ui_views as pv
-from . import ui_views as views
 
 app_name = "portal_ui"
 
@@ -31,22 +29,22 @@ urlpatterns = [
     path("as/stop/", v.dashboard_stop_impersonate, name="dashboard_stop_impersonate"),
     path("appts/", v.appts_list, name="appts_list"),
 
-    path("consultations/book/", pv.book_appt_page, name="book_appt"),
-    path("consultations/book/slots/", pv.book_appt_slots, name="book_appt_slots"),
-    path("consultations/book/create/", pv.book_appt_create, name="book_appt_create"),
+    path("consultations/book/", v.book_appt_page, name="book_appt"),
+    path("consultations/book/slots/", v.book_appt_slots, name="book_appt_slots"),
+    path("consultations/book/create/", v.book_appt_create, name="book_appt_create"),
      # --- Calendar booking (week grid) ---
-    path("consultations/book/calendar/", pv.book_appt_calendar, name="book_appt_calendar"),
-    path("consultations/book/slots-grid/", pv.book_appt_slots_grid, name="book_appt_slots_grid"),
-
-    path("prescriptions/", pv.portal_rx_list, name="rx_list"),
-    path("prescriptions/<int:rx_id>/", pv.portal_rx_detail, name="rx_detail"),
-    path("prescriptions/<int:rx_id>/download/", pv.portal_rx_download, name="rx_download"),
-
-    path("documents/", pv.docs_list, name="docs_list"),
-    path("documents/<int:doc_id>/", pv.doc_detail, name="doc_detail"),
-    path("documents/<int:doc_id>/download/", pv.docs_download, name="docs_download"),
-    path("documents/<int:doc_id>/modal/", pv.docs_view_modal, name="docs_view_modal"),
-    path("tests/", views.portal_tests_list, name="tests_list"),
+    path("consultations/book/calendar/", v.book_appt_calendar, name="book_appt_calendar"),
+    path("consultations/book/slots-grid/", v.book_appt_slots_grid, name="book_appt_slots_grid"),
+
+    path("prescriptions/", v.portal_rx_list, name="rx_list"),
+    path("prescriptions/<int:rx_id>/", v.portal_rx_detail, name="rx_detail"),
+    path("prescriptions/<int:rx_id>/download/", v.portal_rx_download, name="rx_download"),
+
+    path("documents/", v.docs_list, name="docs_list"),
+    path("documents/<int:doc_id>/", v.doc_detail, name="doc_detail"),
+    path("documents/<int:doc_id>/download/", v.docs_download, name="docs_download"),
+    path("documents/<int:doc_id>/modal/", v.docs_view_modal, name="docs_view_modal"),
+    path("tests/", v.portal_tests_list, name="tests_list"),
     path("dashboard/tests-panel/", v.portal_tests_panel, name="tests_panel"),
     path("tests/order/<int:order_id>/", v.portal_tests_order_detail, name="tests_order_detail"),
     path("tests/report/<int:report_id>/", v.portal_tests_report_detail, name="tests_report_detail"),
@@ -1,129 +1,149 @@
 # apps/portal/ui_views.py
 from __future__ import annotations
 
-from typing import Optional, TYPE_CHECKING
-
+import functools
+import hashlib
+import io
+import mimetypes
+import re
+from datetime import datetime, timedelta
+from itertools import groupby
+from os.path import basename, splitext
+from typing import Optional
+from urllib.parse import urlencode
+
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import cache
 from django.core.exceptions import PermissionDenied
-from django.db.models import Q, Count
+from django.db import transaction
+from django.db.models import Q, Count, IntegerField, OuterRef, Prefetch, Subquery, Value
+from django.db.models.functions import Coalesce
 from django.http import HttpRequest, HttpResponse, HttpResponseBadRequest, HttpResponseForbidden, FileResponse, Http404
 from django.shortcuts import get_object_or_404, redirect, render
 from django.template import loader, TemplateDoesNotExist
-from django.utils import timezone
-from datetime import timedelta
-from django.http import HttpResponseBadRequest
-from django.shortcuts import get_object_or_404, render, redirect
+from django.template.loader import render_to_string
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from django.views.decorators.http import require_http_methods, require_POST
-from apps.appointments.models import Appointment, Availability
-from apps.appointments.services import suggest_free_slots
-from apps.patients.models import Patient
-from datetime import datetime
+
+from apps.accounts.signals import BOOKING_CLINICIANS_CACHE_KEY
 from apps.appointments.models import Appointment
-from django.contrib.auth import get_user_model
-from django.template.loader import render_to_string
-from django.contrib.staticfiles.storage import staticfiles_storage
-from django.contrib.staticfiles import finders
-import io
-from os.path import basename
-import mimetypes
-from apps.labs.models import LabOrder, DiagnosticReport
-from apps.labs.models import DiagnosticReport, LabOrder, Observation
-from django.db.models import Prefetch
+from apps.appointments.services import suggest_free_slots
+from apps.appointments.signals import FREE_SLOTS_TTL, free_slots_cache_key
 from apps.labs.forms import PatientExternalResultForm
-from apps.labs.models import ExternalLabResult, LabOrder
-
-
-
-
-
-
-
+from apps.labs.models import DiagnosticReport, ExternalLabResult, LabOrder, Observation
+from apps.messaging.models import Message
+from apps.messaging.signals import UNREAD_BADGE_TTL, unread_badge_cache_key
+from apps.patients.models import Patient, patient_name_key
 
 # --- guarded imports, project may toggle apps on/off in dev ---
-try:
-    from apps.patients.models import Patient  # runtime use
-except Exception:
-    Patient = None  # type: ignore[misc,assignment]
-
-try:
-    from apps.appointments.models import Appointment
-except Exception:
-    Appointment = None  # type: ignore
-
 try:
     from apps.documents.models import Document
 except Exception:
     Document = None  # type: ignore
 
-from apps.messaging.models import Message
-
-if TYPE_CHECKING:
-    from apps.patients.models import Patient as PatientModel
-else:
-    class PatientModel:  # minimal stand-in for type hints
-        pass
-
-
 try:
     from apps.prescriptions.models import Prescription
 except Exception:
-   
-    Prescription = None
+    Prescription = None  # type: ignore
 
 User = get_user_model()
 
-from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
 
-try:
-    from apps.documents.models import Document
-except Exception:
-    Document = None 
-
-
-
-
-
-from typing import Optional, TYPE_CHECKING
-if TYPE_CHECKING:
-    from apps.patients.models import Patient as PatientT
-
-def _current_patient_for_user(user) -> Optional["PatientT"]:
-   
+def _current_patient_for_user(user) -> Optional[Patient]:
+    """Return the Patient linked to this user (portal account)."""
     if hasattr(user, "patient") and isinstance(getattr(user, "patient"), Patient):
         return user.patient
 
-   
     prof = getattr(user, "profile", None)
     if prof and hasattr(prof, "patient") and isinstance(prof.patient, Patient):
         return prof.patient
 
-    
+    # Patient.email is stored lowercased
     email = (user.email or "").strip().lower()
     if email:
-        try:
-            return Patient.objects.get(email__iexact=email)
-        except Patient.DoesNotExist:
-            pass
+        return Patient.objects.filter(email=email).first()
 
     return None
 
 
-def _current_patient_for_user(user):
-    """Return the Patient linked to this user (portal account)."""
-    try:
-        from apps.patients.models import Patient
-    except Exception:
-        return None
-    return getattr(user, "patient", None) or Patient.objects.filter(email__iexact=user.email).first()
-
 # ============================================================================
 # helpers
 # ============================================================================
 
-def _patient_from_request(request: HttpRequest) -> Optional["PatientModel"]:
+# Session key for the patient pk resolved by _patient_from_request().
+# logout() flushes the session, so it never outlives the login.
+_RESOLVED_PATIENT_SESSION_KEY = "portal_resolved_patient_id"
+
+
+# Appointment columns the portal appointment cards render.
+_APPT_CARD_FIELDS = ("id", "start", "status", "location", "clinician")
+_APPT_CLINICIAN_FIELDS = (
+    "clinician__id",
+    "clinician__username",
+    "clinician__first_name",
+    "clinician__last_name",
+    "clinician__avatar",
+)
+
+
+@functools.cache
+def _appt_fields() -> frozenset[str]:
+    # Model fields are fixed once the app registry is ready; walk _meta once.
+    try:
+        return frozenset(f.name for f in Appointment._meta.get_fields()) if Appointment else frozenset()
+    except Exception:
+        return frozenset()
+
+
+@functools.cache
+def _patient_fields() -> frozenset[str]:
+    try:
+        return frozenset(f.name for f in Patient._meta.get_fields())
+    except Exception:
+        return frozenset()
+
+
+def _appt_cards(qs, appt_fields):
+    """Restrict an Appointment queryset to card columns, joining the clinician."""
+    fields = [f for f in _APPT_CARD_FIELDS if f in appt_fields]
+    if "clinician" in appt_fields:
+        qs = qs.select_related("clinician")
+        fields += _APPT_CLINICIAN_FIELDS
+    return qs.only(*fields)
+
+
+# _patient_from_request() steps, in priority order.
+_STEP_IMPERSONATE_SESSION = 0
+_STEP_IMPERSONATE_QUERY = 1
+_STEP_SESSION_CACHE = 2
+_STEP_USER_FK = 3
+_STEP_EMAIL = 4
+_STEP_NAME = 5
+
+
+def _remember_patient(request: HttpRequest, p):
+    request.session[_RESOLVED_PATIENT_SESSION_KEY] = p.pk
+    return p
+
+
+def _portal_patients():
+    """
+    Active, unmerged patients without the search columns: the portal never
+    reads them and search_vector is the widest value on the row.
+    """
+    return Patient.objects.filter(is_active=True, merged_into__isnull=True).defer(
+        "search_vector", "search_blob"
+    )
+
+
+def _patient_from_request(request: HttpRequest) -> Optional[Patient]:
     """
     Resolve the 'active patient' for the portal session.
 
@@ -132,62 +152,68 @@ def _patient_from_request(request: HttpRequest) -> Optional["PatientModel"]:
       2) If Patient model has 'user' FK, use it
       3) Match by email
       4) Match by first/last name
+    Steps 2-4 are remembered per session as a patient pk. All applicable
+    lookups go to the database in one round trip.
     """
     if not Patient:
         return None
 
+    # Every applicable step becomes one filter, numbered in priority order;
+    # they run as a single UNION ALL and the lowest-numbered hit wins.
+    steps = []
+
     # 1) superuser impersonation
     if getattr(request.user, "is_superuser", False):
         pid = request.session.get("portal_impersonate_patient_id")
         if pid:
-            p = Patient.objects.filter(pk=pid, is_active=True, merged_into__isnull=True).first()
-            if p:
-                return p
+            steps.append((_STEP_IMPERSONATE_SESSION, {"pk": pid}))
         qpid = request.GET.get("patient_id")
         if qpid:
-            p = Patient.objects.filter(pk=qpid, is_active=True, merged_into__isnull=True).first()
-            if p:
-                return p
+            steps.append((_STEP_IMPERSONATE_QUERY, {"pk": qpid}))
+
+    # Resolved earlier in this session: a PK hit settles steps 2-4
+    cached_pid = request.session.get(_RESOLVED_PATIENT_SESSION_KEY)
+    if cached_pid:
+        steps.append((_STEP_SESSION_CACHE, {"pk": cached_pid}))
 
     # 2) FK 'user' if it exists
-    try:
-        patient_fields = {f.name for f in Patient._meta.get_fields()}
-    except Exception:
-        patient_fields = set()
-    if "user" in patient_fields:
-        p = Patient.objects.filter(
-            user=request.user,
-            is_active=True,
-            merged_into__isnull=True,
-        ).first()
-        if p:
-            return p
-
-    # 3) email match
-    email = (getattr(request.user, "email", "") or "").strip()
+    if "user" in _patient_fields():
+        steps.append((_STEP_USER_FK, {"user": request.user}))
+
+    # 3) email match (Patient.email is stored lowercased)
+    email = (getattr(request.user, "email", "") or "").strip().lower()
     if email:
-        p = Patient.objects.filter(
-            email__iexact=email,
-            is_active=True,
-            merged_into__isnull=True,
-        ).first()
-        if p:
-            return p
+        steps.append((_STEP_EMAIL, {"email": email}))
 
     # 4) name match
     first = (getattr(request.user, "first_name", "") or "").strip()
     last  = (getattr(request.user, "last_name", "") or "").strip()
     if first or last:
-        filters = {"is_active": True, "merged_into__isnull": True}
-        if first:
-            filters["given_name__iexact"] = first
-        if last:
-            filters["family_name__iexact"] = last
-        p = Patient.objects.filter(**filters).first()
-        if p:
-            return p
+        if first and last:
+            # one seek on the indexed name_key instead of two UPPER() probes
+            filters = {"name_key": patient_name_key(first, last)}
+        else:
+            filters = {"given_name__iexact": first} if first else {"family_name__iexact": last}
+        steps.append((_STEP_NAME, filters))
 
-    return None
+    if not steps:
+        return None
+    legs = [
+        _portal_patients().filter(**filters).annotate(resolve_step=Value(step)).order_by()
+        for step, filters in steps
+    ]
+    p = (
+        legs[0].union(*legs[1:], all=True)
+        .order_by("resolve_step", "family_name", "given_name", "id")
+        .first()
+    )
+
+    if p and p.resolve_step <= _STEP_SESSION_CACHE:
+        return p
+    if cached_pid:
+        # the cached pk no longer resolves (merged/deactivated)
+        request.session.pop(_RESOLVED_PATIENT_SESSION_KEY, None)
+    return _remember_patient(request, p) if p else None
 
 
 def _clinician_user_qs():
@@ -198,19 +224,44 @@ def _is_admin_preview(request: HttpRequest) -> bool:
     return bool(request.user.is_superuser and request.session.get("portal_impersonate_patient_id"))
 
 
+@functools.lru_cache(maxsize=256)
+def _select_cached(candidates: tuple[str, ...]):
+    # Misses are cached too (as None) so a panel with no template doesn't
+    # re-probe every loader on each poll.
+    try:
+        return loader.select_template(list(candidates))
+    except TemplateDoesNotExist:
+        return None
+
+
+def _select(candidate_templates: list[str]):
+    # In DEBUG keep going through the loader so edited templates reload.
+    if settings.DEBUG:
+        return loader.select_template(candidate_templates)
+    tmpl = _select_cached(tuple(candidate_templates))
+    if tmpl is None:
+        raise TemplateDoesNotExist(", ".join(candidate_templates))
+    return tmpl
+
+
+# Body for a panel whose template is missing in production; built once.
+_TEMPLATE_MISSING_HTML = (
+    b'<section class="p-4 text-sm text-gray-600">'
+    b'<div class="font-semibold">This section is unavailable.</div>'
+    b"</section>"
+)
+
+
 def _render_best(request: HttpRequest, candidate_templates: list[str], context: dict) -> HttpResponse:
     try:
-        tmpl = loader.select_template(candidate_templates)
+        tmpl = _select(candidate_templates)
         return HttpResponse(tmpl.render(context | {"__template_used": tmpl.origin.template_name}, request))
     except TemplateDoesNotExist:
-        used = ", ".join(candidate_templates)
-        html = f"""
-        <section class="p-4 text-sm text-gray-600">
-          <div class="font-semibold">Template not found</div>
-          <div>Looked for: <code>{used}</code></div>
-        </section>
-        """
-        return HttpResponse(html)
+        # A missing template is a deploy bug: show the debug page in DEBUG,
+        # a 500 stub otherwise. Callers add headers, so no shared response.
+        if settings.DEBUG:
+            raise
+        return HttpResponse(_TEMPLATE_MISSING_HTML, status=500)
 
 
 # ============================================================================
@@ -265,10 +316,7 @@ def appts_panel(request: HttpRequest):
             qs = Appointment.objects.all()
 
             # Filter by patient if field exists
-            try:
-                appt_fields = {f.name for f in Appointment._meta.get_fields()}
-            except Exception:
-                appt_fields = set()
+            appt_fields = _appt_fields()
 
             if "patient" in appt_fields:
                 qs = qs.filter(patient=patient)
@@ -284,7 +332,7 @@ def appts_panel(request: HttpRequest):
             if "status" in appt_fields:
                 qs = qs.exclude(status__iexact="cancelled")
 
-            appts = list(qs[:10])
+            appts = list(_appt_cards(qs, appt_fields)[:10])
 
     return _render_best(
         request,
@@ -324,30 +372,76 @@ def rx_panel(request: HttpRequest):
 # messaging (patient side)
 # ============================================================================
 
+@functools.cache
+def _read_db() -> str:
+    """Alias for lag-tolerant reads: the replica when one is configured."""
+    return "replica" if "replica" in settings.DATABASES else "default"
+
+
+def _inbox_snapshot(request: HttpRequest, patient):
+    """
+    (total, {sender_id: unread}) for DMs to request.user from the patient's
+    allowed clinicians, in one GROUP BY. Memoized on the request, and the
+    total primes the navbar badge cache so the next poll skips the DB.
+    """
+    snap = getattr(request, "_inbox_snapshot", None)
+    if snap is None:
+        allowed_ids = _allowed_clinician_ids(request, patient)
+        rows = (
+            Message.objects.using(_read_db()).filter(
+                to_user=request.user,
+                is_read=False,
+                kind="dm",
+                from_user_id__in=allowed_ids,
+            )
+            .order_by()
+            .values("from_user_id")
+            .annotate(c=Count("*"))
+            if allowed_ids
+            else ()  # nobody to hear from: 0 without a query
+        )
+        snap = _remember_inbox_snapshot(request, {r["from_user_id"]: r["c"] for r in rows})
+    return snap
+
+
+def _remember_inbox_snapshot(request: HttpRequest, per_sender: dict):
+    snap = request._inbox_snapshot = (sum(per_sender.values()), per_sender)
+    if not request.user.is_superuser:
+        cache.set(unread_badge_cache_key(request.user.pk), snap[0], UNREAD_BADGE_TTL)
+    return snap
+
+
 @login_required
 def messages_panel(request: HttpRequest):
     patient = _patient_from_request(request)
     if not patient and not request.user.is_superuser:
         return HttpResponseBadRequest("No patient")
 
-    # Only clinicians this patient is allowed to contact
-    clinicians_qs = _allowed_clinicians_for(patient) if patient else User.objects.none()
-    clinicians = list(clinicians_qs.order_by("last_name", "first_name", "id")[:50])
-
-    # Unread counts from allowed clinicians only
-    unread_rows = (
-        Message.objects.filter(
-            kind="dm",
-            to_user=request.user,
-            is_read=False,
-            from_user__in=clinicians_qs,
+    # Only clinicians this patient is allowed to contact; none means an
+    # empty panel (and a zero badge) without touching the database.
+    allowed_ids = _allowed_clinician_ids(request, patient)
+    clinicians = []
+    if allowed_ids:
+        # Unread counts ride along as a correlated subquery: one round trip.
+        unread_sq = (
+            Message.objects.filter(kind="dm", to_user=request.user, is_read=False, from_user=OuterRef("pk"))
+            .order_by()
+            .values("from_user")
+            .annotate(c=Count("*"))
+            .values("c")
         )
-        .values("from_user_id")
-        .annotate(cnt=Count("id"))
-    )
-    unread_by_sender = {r["from_user_id"]: r["cnt"] for r in unread_rows}
-    for c in clinicians:
-        c.unread_count = unread_by_sender.get(c.id, 0)
+        clinicians = list(
+            User.objects.using(_read_db())
+            .filter(id__in=allowed_ids)
+            .annotate(unread_count=Coalesce(Subquery(unread_sq, output_field=IntegerField()), 0))
+            .only("id", "username", "first_name", "last_name", "last_login", "avatar")
+            .order_by("last_name", "first_name", "id")[:50]
+        )
+
+    # An untruncated list covers every allowed sender, so it doubles as the
+    # badge snapshot.
+    if len(clinicians) < 50:
+        _remember_inbox_snapshot(request, {c.id: c.unread_count for c in clinicians if c.unread_count})
 
     admin_preview = _is_admin_preview(request)
     return _render_best(
@@ -358,6 +452,83 @@ def messages_panel(request: HttpRequest):
 
 
 
+_DM_PAGE_SIZE = 30
+
+# tells the navbar badges to refetch (HX-Trigger response header)
+_HX_REFRESH_BADGES = '{"refresh-badges": true}'
+
+
+def _load_dm_thread(me, clinician, before_id=None):
+    """
+    Load one page of the pair's thread: the newest 30 messages (as dicts,
+    oldest first), or the 30 before `before_id`. Opening the latest page
+    also marks the clinician's unread DMs to `me` as read, in the same
+    transaction. Returns (msgs, has_older, marked_read).
+    """
+    # One leg per direction, UNION ALL'd: each is a backward range scan on
+    # msg_dm_thread_idx instead of an OR across both directions.
+    cols = ("id", "body", "from_user_id", "to_user_id", "is_read", "created_at")
+    sent = Message.objects.filter(kind="dm", from_user=me, to_user=clinician)
+    received = Message.objects.filter(kind="dm", from_user=clinician, to_user=me)
+    if before_id is not None:
+        sent = sent.filter(id__lt=before_id)
+        received = received.filter(id__lt=before_id)
+    sent = sent.order_by().values(*cols)
+    received = received.order_by().values(*cols)
+
+    marked_read = 0
+    with transaction.atomic():
+        # one extra row says whether an older page exists
+        msgs = list(sent.union(received, all=True).order_by("-id")[: _DM_PAGE_SIZE + 1])
+        has_older = len(msgs) > _DM_PAGE_SIZE
+        msgs = msgs[:_DM_PAGE_SIZE][::-1]
+        if before_id is None:
+            unread_ids = [m["id"] for m in msgs if m["from_user_id"] == clinician.pk and not m["is_read"]]
+            if has_older:
+                # older pages may still hide unread rows
+                marked_read = Message.objects.filter(
+                    kind="dm",
+                    from_user=clinician,
+                    to_user=me,
+                    is_read=False,
+                ).update(is_read=True)
+            elif unread_ids:
+                # complete thread: the page holds every unread row, so
+                # update those by pk; nothing unread (the common case)
+                # needs no UPDATE at all
+                marked_read = Message.objects.filter(pk__in=unread_ids, is_read=False).update(is_read=True)
+    if marked_read:
+        cache.delete(unread_badge_cache_key(me.pk))
+        for m in msgs:
+            if m["from_user_id"] == clinician.pk:
+                m["is_read"] = True
+    return msgs, has_older, marked_read
+
+
+def _render_dm_thread(request: HttpRequest, clinician, template_names):
+    """
+    Open the latest page of the thread with `clinician` (marking it read) and
+    render it with the first template that exists. Shared by messages_thread
+    and messages_chat, which differ only in the template.
+    """
+    msgs, has_older, marked_read = _load_dm_thread(request.user, clinician)
+    resp = _render_best(
+        request,
+        template_names,
+        {
+            "msgs": msgs,
+            "has_older": has_older,
+            "clinician": clinician,
+            "me": request.user,
+            "admin_preview": _is_admin_preview(request),
+        },
+    )
+    # badges only change when something was actually marked read
+    if marked_read:
+        resp["HX-Trigger"] = _HX_REFRESH_BADGES
+    return resp
+
+
 @login_required
 def messages_thread(request: HttpRequest):
     patient = _patient_from_request(request)
@@ -368,36 +539,26 @@ def messages_thread(request: HttpRequest):
     if not cid:
         return HttpResponseBadRequest("Missing clinician")
 
-    clinician = get_object_or_404(User, pk=cid, is_staff=True, is_active=True)
-
     # Enforce: patient can only DM allowed clinicians
-    allowed_ids = set(_allowed_clinicians_for(patient).values_list("id", flat=True)) if patient else set()
-    if clinician.id not in allowed_ids and not request.user.is_superuser:
+    clinician = _dm_clinician(request, patient, cid)
+    if clinician is None:
         return HttpResponseForbidden("Not allowed.")
 
-    msgs = (
-        Message.objects.filter(kind="dm")
-        .filter(
-            (Q(from_user=request.user) & Q(to_user=clinician))
-            | (Q(from_user=clinician) & Q(to_user=request.user))
+    # "Load older" button: just the previous page, swapped in above.
+    before_id = request.GET.get("before_id")
+    if before_id:
+        try:
+            before_id = int(before_id)
+        except ValueError:
+            return HttpResponseBadRequest("Invalid before_id")
+        msgs, has_older, _ = _load_dm_thread(request.user, clinician, before_id=before_id)
+        return render(
+            request,
+            "portal/partials/_thread_page.html",
+            {"msgs": msgs, "has_older": has_older, "clinician": clinician, "me": request.user},
         )
-        .order_by("id")[:200]
-    )
 
-    # mark incoming as read
-    Message.objects.filter(
-        kind="dm",
-        from_user=clinician,
-        to_user=request.user,
-        is_read=False,
-    ).update(is_read=True)
-
-    admin_preview = _is_admin_preview(request)
-    return _render_best(
-        request,
-        ["portal/partials/_thread.html", "portal/_thread.html"],
-        {"msgs": msgs, "clinician": clinician, "me": request.user, "admin_preview": admin_preview},
-    )
+    return _render_dm_thread(request, clinician, ["portal/partials/_thread.html", "portal/_thread.html"])
 
 
 
@@ -418,11 +579,9 @@ def messages_send(request: HttpRequest):
     if not cid or not body:
         return HttpResponseBadRequest("Missing fields")
 
-    clinician = get_object_or_404(User, pk=cid, is_staff=True, is_active=True)
-
     # Enforce: patient can only DM allowed clinicians
-    allowed_ids = set(_allowed_clinicians_for(patient).values_list("id", flat=True)) if patient else set()
-    if clinician.id not in allowed_ids and not request.user.is_superuser:
+    clinician = _dm_clinician(request, patient, cid)
+    if clinician is None:
         return HttpResponseForbidden("Not allowed.")
 
     m = Message.objects.create(
@@ -434,13 +593,13 @@ def messages_send(request: HttpRequest):
         is_read=False,
     )
 
-    html_resp = _render_best(
+    # No refresh-badges trigger: sending never changes the sender's own
+    # unread count, so a badge refetch would just repeat the same answer.
+    return _render_best(
         request,
         ["portal/partials/_msg_bubble.html", "portal/_msg_bubble.html"],
-        {"m": m, "me": request.user},
+        {"msgs": [m], "me": request.user},
     )
-    html_resp["HX-Trigger"] = '{"refresh-badges": true}'
-    return html_resp
 
 
 
@@ -454,37 +613,12 @@ def messages_chat(request: HttpRequest):
     if not cid:
         return messages_panel(request)
 
-    clinician = get_object_or_404(User, pk=cid, is_staff=True, is_active=True)
-
     # Enforce: patient can only DM allowed clinicians
-    allowed_ids = set(_allowed_clinicians_for(patient).values_list("id", flat=True)) if patient else set()
-    if clinician.id not in allowed_ids and not request.user.is_superuser:
+    clinician = _dm_clinician(request, patient, cid)
+    if clinician is None:
         return HttpResponseForbidden("Not allowed.")
 
-    msgs = (
-        Message.objects.filter(kind="dm")
-        .filter(
-            (Q(from_user=request.user) & Q(to_user=clinician))
-            | (Q(from_user=clinician) & Q(to_user=request.user))
-        )
-        .order_by("id")[:200]
-    )
-
-    Message.objects.filter(
-        kind="dm",
-        from_user=clinician,
-        to_user=request.user,
-        is_read=False,
-    ).update(is_read=True)
-
-    admin_preview = _is_admin_preview(request)
-    resp = _render_best(
-        request,
-        ["portal/messages_chat.html", "portal/partials/messages_chat.html"],
-        {"clinician": clinician, "msgs": msgs, "me": request.user, "admin_preview": admin_preview},
-    )
-    resp["HX-Trigger"] = '{"refresh-badges": true}'
-    return resp
+    return _render_dm_thread(request, clinician, ["portal/messages_chat.html", "portal/partials/messages_chat.html"])
 
 
 
@@ -494,14 +628,12 @@ def messages_chat(request: HttpRequest):
 
 @login_required
 def unread_total_badge(request: HttpRequest):
-    patient = _patient_from_request(request)
-    allowed_qs = _allowed_clinicians_for(patient) if patient else User.objects.none()
-    total = Message.objects.filter(
-        to_user=request.user,
-        is_read=False,
-        kind="dm",
-        from_user__in=allowed_qs,
-    ).count()
+    # Polled on every page; a few seconds of staleness is fine. Superusers
+    # previewing other patients always count live. A hit skips patient
+    # resolution too, so it costs no queries at all.
+    total = None if request.user.is_superuser else cache.get(unread_badge_cache_key(request.user.pk))
+    if total is None:
+        total = _inbox_snapshot(request, _patient_from_request(request))[0]
     return _render_best(
         request,
         ["portal/partials/_inbox_badge.html", "portal/_inbox_badge.html"],
@@ -538,6 +670,36 @@ def profile_update(request: HttpRequest):
     )
 
 
+def _keyset_page(qs, size: int, *, after_start=None, after_id=None, by_start: bool = True):
+    """
+    One page of `qs` in (-start, -id) order (or -id without a start field),
+    after the cursor row. Returns (rows, next_cursor); next_cursor is None
+    on the last page. Fetches size + 1 rows to detect a next page.
+    """
+    if by_start:
+        qs = qs.order_by("-start", "-id")
+        if after_start is not None and after_id is not None:
+            # start__lte bounds the index range; the OR only resolves ties
+            qs = qs.filter(
+                Q(start__lte=after_start),
+                Q(start__lt=after_start) | Q(start=after_start, id__lt=after_id),
+            )
+    else:
+        qs = qs.order_by("-id")
+        if after_id is not None:
+            qs = qs.filter(id__lt=after_id)
+
+    rows = list(qs[: size + 1])
+    if len(rows) <= size:
+        return rows, None
+    rows = rows[:size]
+    last = rows[-1]
+    next_cursor = {"after_id": last.id}
+    if by_start:
+        next_cursor["after_start"] = last.start.isoformat()
+    return rows, next_cursor
+
+
 @login_required
 def appts_list(request: HttpRequest):
     """
@@ -545,18 +707,32 @@ def appts_list(request: HttpRequest):
     Query params:
       - status: all|upcoming|past|cancelled (if Appointment has 'status')
       - q: search by clinician name
-      - page, page_size
+      - after_start, after_id: keyset cursor (last row of the previous page)
+      - page_size
     """
     patient = _patient_from_request(request)
     if not patient and not request.user.is_superuser:
         raise PermissionDenied("No patient context.")
 
     appts = []
-    total = 0
+    next_cursor = None
     status = (request.GET.get("status") or "all").lower()
     q = (request.GET.get("q") or "").strip()
-    page = request.GET.get("page") or "1"
     page_size = request.GET.get("page_size") or "10"
+    try:
+        after_start = parse_datetime(request.GET.get("after_start") or "")
+    except ValueError:
+        # well-formed but impossible, e.g. 2024-13-45T00:00
+        after_start = None
+    try:
+        after_id = int(request.GET.get("after_id") or "")
+    except ValueError:
+        after_id = None
+    # A cursor is only usable whole (just the id when there is no start
+    # field); a partial or malformed one means the first page.
+    by_start = "start" in _appt_fields()
+    if after_id is None or (by_start and after_start is None):
+        after_start = after_id = None
 
     try:
         page_size_i = max(5, min(50, int(page_size)))
@@ -567,10 +743,7 @@ def appts_list(request: HttpRequest):
         qs = Appointment.objects.all()
 
         # limit to this patient if FK exists
-        try:
-            appt_fields = {f.name for f in Appointment._meta.get_fields()}
-        except Exception:
-            appt_fields = set()
+        appt_fields = _appt_fields()
 
         if "patient" in appt_fields:
             qs = qs.filter(patient=patient)
@@ -594,33 +767,31 @@ def appts_list(request: HttpRequest):
                     | Q(clinician__username__icontains=q)
                 )
 
-        # sensible ordering
-        if "start" in appt_fields:
-            qs = qs.order_by("-start")
-        else:
-            qs = qs.order_by("-id")
-
-        paginator = Paginator(qs, page_size_i)
-        try:
-            page_obj = paginator.page(page)
-        except (PageNotAnInteger, EmptyPage):
-            page_obj = paginator.page(1)
-
-        appts = list(page_obj.object_list)
-        total = paginator.count
-    else:
-        page_obj = None
+        # the cards only render these columns (and the joined clinician)
+        qs = _appt_cards(qs, appt_fields)
+
+        # Keyset pagination, newest first: no COUNT(*), and each page is an
+        # index seek from the cursor however deep the list goes.
+        appts, next_cursor = _keyset_page(
+            qs,
+            page_size_i,
+            after_start=after_start,
+            after_id=after_id,
+            by_start=by_start,
+        )
 
+    base_params = {"q": q, "status": status, "page_size": page_size_i}
     return _render_best(
         request,
         ["portal/appts_list.html"],
         {
             "appts": appts,
-            "total": total,
             "status": status,
             "q": q,
-            "page_obj": page_obj,
             "page_size": page_size_i,
+            "is_first_page": after_id is None,
+            "first_query": urlencode(base_params),
+            "next_query": urlencode(base_params | next_cursor) if next_cursor else "",
         },
     )
 
@@ -628,16 +799,29 @@ def appts_list(request: HttpRequest):
     
 
 
+def _clinicians_for_booking() -> list:
+    """
+    Active staff users for the booking page dropdown. Cached for 60s;
+    accounts.signals drops the entry when a user changes.
+    """
+    return cache.get_or_set(
+        BOOKING_CLINICIANS_CACHE_KEY,
+        lambda: list(
+            User.objects.filter(is_staff=True, is_active=True)
+            .only("id", "username", "first_name", "last_name")
+            .order_by("last_name", "first_name", "id")
+        ),
+        60,
+    )
+
+
 @login_required
 @require_http_methods(["GET"])
 def book_appt_page(request):
     """
     Renders the booking page with filters and a Find Slots button.
     """
-    clinicians = (
-        User.objects.filter(is_staff=True, is_active=True)
-        .order_by("last_name", "first_name", "id")
-    )
+    clinicians = _clinicians_for_booking()
 
     # Defaults
     now = timezone.localtime()
@@ -661,6 +845,17 @@ def book_appt_page(request):
     return render(request, "portal/consultations/book.html", ctx)
 
 
+def _parse_iso_local(value: str):
+    """
+    Parse an ISO datetime from the booking forms. fromisoformat() takes
+    'Z' and offsets as-is; naive values are read as local time.
+    """
+    if not value:
+        return None
+    dt = datetime.fromisoformat(value)
+    return dt if dt.tzinfo else timezone.make_aware(dt)
+
+
 @login_required
 @require_http_methods(["GET"])
 def book_appt_slots(request):
@@ -675,28 +870,33 @@ def book_appt_slots(request):
     if not clinician_id:
         return HttpResponseBadRequest("Missing clinician_id")
 
-    # Parse ISO local datetime values from the datetime-local inputs
-    def _parse_local(dt_str: str):
-        # Expect e.g. "2025-10-14T09:30"
-        return timezone.make_aware(timezone.datetime.fromisoformat(dt_str)) if dt_str else None
-
-    df = _parse_local(date_from)
-    dt = _parse_local(date_to)
+    # ISO local datetime values from the datetime-local inputs
+    try:
+        df = _parse_iso_local(date_from)
+        dt = _parse_iso_local(date_to)
+    except ValueError:
+        return HttpResponseBadRequest("Invalid date range")
 
     if not df:
-        df = timezone.localtime()
+        # minute precision so repeated "from now" requests share a cache key
+        df = timezone.localtime().replace(second=0, microsecond=0)
     if not dt:
         dt = df + timedelta(days=7)
 
-    # Call your availability service
-    slots = suggest_free_slots(
-        clinician_id=int(clinician_id),
-        date_from=df,
-        date_to=dt,
-        duration_minutes=duration,
-        step_minutes=None,
-        patient_id=None,  
-        limit=40,
+    # Filter tweaks re-fire this endpoint; identical windows hit the cache.
+    clinician_id = int(clinician_id)
+    slots = cache.get_or_set(
+        free_slots_cache_key(clinician_id, df, dt, duration),
+        lambda: suggest_free_slots(
+            clinician_id=clinician_id,
+            date_from=df,
+            date_to=dt,
+            duration_minutes=duration,
+            step_minutes=None,
+            patient_id=None,
+            limit=40,
+        ),
+        FREE_SLOTS_TTL,
     )
 
     return render(
@@ -706,14 +906,9 @@ def book_appt_slots(request):
     )
 
 
-@login_required
-@require_POST
 @login_required
 @require_POST
 def book_appt_create(request):
-    from datetime import datetime
-    from django.utils import timezone
-
     # Resolve patient
     patient = _current_patient_for_user(request.user)
     if not patient:
@@ -727,7 +922,7 @@ def book_appt_create(request):
         return HttpResponseBadRequest("Missing fields")
 
     # Enforce clinician restriction
-    allowed_ids = set(_allowed_clinicians_for(patient).values_list("id", flat=True))
+    allowed_ids = _allowed_clinician_ids(request, patient)
     try:
         requested_id = int(clinician_id)
     except ValueError:
@@ -737,24 +932,17 @@ def book_appt_create(request):
 
     clinician = get_object_or_404(User, pk=requested_id, is_staff=True, is_active=True)
 
-    # Robust ISO parsing (aware/naive/'Z')
     try:
-        dt = datetime.fromisoformat(start_iso.replace("Z", "+00:00"))
+        start = _parse_iso_local(start_iso).astimezone(timezone.get_current_timezone())
     except ValueError:
         return HttpResponseBadRequest("Invalid start time")
 
-    start = dt if dt.tzinfo else timezone.make_aware(dt)
-    start = start.astimezone(timezone.get_current_timezone())
-
     # If appointments app is missing, bail early
     if Appointment is None:
         return HttpResponseBadRequest("Appointments module not installed.")
 
     # Build create kwargs defensively, only setting fields that exist
-    try:
-        appt_fields = {f.name for f in Appointment._meta.get_fields()}
-    except Exception:
-        appt_fields = set()
+    appt_fields = _appt_fields()
 
     appt_kwargs = {}
     if "patient" in appt_fields:
@@ -800,21 +988,23 @@ def book_appt_calendar(request):
     if not patient:
         return HttpResponseBadRequest("No patient profile linked to your account.")
 
-    # Only allowed clinicians for this patient
-    clinicians = _allowed_clinicians_for(patient).order_by("last_name", "first_name", "id")
+    # Only allowed clinicians for this patient; the picker shows names only
+    clinicians = list(
+        _allowed_clinicians_for(request, patient)
+        .only("id", "username", "first_name", "last_name")
+        .order_by("last_name", "first_name", "id")
+    )
 
     clinician_id = request.GET.get("clinician")
     duration = int(request.GET.get("duration") or 30)
 
     # If there is exactly ONE allowed clinician, preselect it
     only_id = None
-    if clinicians.count() == 1:
-        only_id = clinicians.first().id
+    if len(clinicians) == 1:
+        only_id = clinicians[0].id
         clinician_id = clinician_id or str(only_id)
 
     # week start handling 
-    from datetime import datetime, timedelta
-    from django.utils import timezone
     today_local = timezone.localdate()
     week_start_str = request.GET.get("week_start")
     try:
@@ -838,9 +1028,6 @@ def book_appt_calendar(request):
 @login_required
 @require_http_methods(["GET"])
 def book_appt_slots_grid(request):
-    from datetime import datetime, timedelta
-    from django.utils import timezone
-
     patient = _current_patient_for_user(request.user)
     if not patient:
         return HttpResponseBadRequest("No patient profile linked to your account.")
@@ -874,7 +1061,7 @@ def book_appt_slots_grid(request):
         )
 
     # Enforce clinician restriction
-    allowed_ids = set(_allowed_clinicians_for(patient).values_list("id", flat=True))
+    allowed_ids = _allowed_clinician_ids(request, patient)
     try:
         requested_id = int(clinician_id)
     except ValueError:
@@ -924,17 +1111,10 @@ def book_appt_slots_grid(request):
             },
         )
 
-    # Group + sort
-    slots_by_day = {}
-    for s in slots:
-        sdt = s["start"] if isinstance(s, dict) else getattr(s, "start", None)
-        if not sdt:
-            continue
-        sdt = sdt.astimezone(tz)
-        d = sdt.date()
-        slots_by_day.setdefault(d, []).append(sdt)
-    for d, arr in slots_by_day.items():
-        arr.sort()
+    # One sort of the local start times, then a single grouping pass by day
+    # (suggest_free_slots returns dicts, in availability-window order).
+    starts = sorted(s["start"].astimezone(tz) for s in slots)
+    slots_by_day = {d: list(day_starts) for d, day_starts in groupby(starts, key=datetime.date)}
 
     return render(
         request,
@@ -950,44 +1130,75 @@ def book_appt_slots_grid(request):
 
 
 
-def _allowed_clinicians_for(patient):
+def _allowed_clinician_ids(request: HttpRequest, patient) -> list[int]:
     """
-    Return a queryset of clinicians the patient is allowed to book with.
+    Ids of the clinicians the patient is allowed to book with and message.
     Priority:
-      1) patient.primary_clinician (if present)
-      2) patient.clinician (if present)
-      3) patient.created_by (if staff)
-      4) last clinician from existing appointments (fallback)
+      1) patient.primary_clinician / clinician / created_by (if staff)
+      2) last clinician from existing appointments (fallback)
+    Resolved once per request; every messaging/booking check reuses it.
     """
-    
-    direct_users = []
-    for attr in ("primary_clinician", "clinician", "created_by"):
-        if hasattr(patient, attr):
-            u = getattr(patient, attr)
-            if u and getattr(u, "is_staff", False):
-                direct_users.append(u)
+    ids = getattr(request, "_allowed_clinician_ids", None)
+    if ids is not None:
+        return ids
+    ids = []
+    if patient:
+        # FK ids only: one query checks staff/active for all of them.
+        direct_ids = {
+            getattr(patient, f"{attr}_id", None) for attr in ("primary_clinician", "clinician", "created_by")
+        } - {None}
+        rows = (
+            list(User.objects.filter(id__in=direct_ids, is_staff=True).values_list("id", "is_active"))
+            if direct_ids
+            else []
+        )
+        if rows:
+            ids = [uid for uid, active in rows if active]
+        else:
+            try:
+                # Latest appointment's clinician, staff/active checked in the same join.
+                last = (
+                    Appointment.objects
+                    .filter(patient=patient)
+                    .exclude(clinician__isnull=True)
+                    .order_by("-start")
+                    .values_list("clinician_id", "clinician__is_staff", "clinician__is_active")
+                    .first()
+                )
+                if last and last[1] and last[2]:
+                    ids = [last[0]]
+            except Exception:
+                pass
+    request._allowed_clinician_ids = ids
+    return ids
 
-    if direct_users:
-        ids = {u.id for u in direct_users if getattr(u, "is_active", True)}
-        return User.objects.filter(id__in=ids, is_staff=True, is_active=True)
 
-    
+def _is_clinician_allowed(request: HttpRequest, patient, clinician_id) -> bool:
+    """Whether the patient may message this clinician; superusers always may."""
+    if request.user.is_superuser:
+        # skip resolving the allowed set entirely
+        return True
+    return int(clinician_id) in _allowed_clinician_ids(request, patient)
+
+
+def _dm_clinician(request: HttpRequest, patient, cid):
+    """
+    The active staff user `cid` if the patient may message them, else None.
+    The permission check runs on the memoized allowed set first, so a refused
+    request never fetches the user row.
+    """
     try:
-        from apps.appointments.models import Appointment
-        last = (
-            Appointment.objects
-            .filter(patient=patient)
-            .exclude(clinician__isnull=True)
-            .order_by("-start")
-            .first()
-        )
-        if last and last.clinician and last.clinician.is_staff and last.clinician.is_active:
-            return User.objects.filter(id=last.clinician_id, is_staff=True, is_active=True)
-    except Exception:
-        pass
+        cid = int(cid)
+    except (TypeError, ValueError):
+        return None
+    if not _is_clinician_allowed(request, patient, cid):
+        return None
+    return User.objects.filter(pk=cid, is_staff=True, is_active=True).first()
 
-    
-    return User.objects.none()
+
+def _allowed_clinicians_for(request: HttpRequest, patient):
+    """Queryset of the clinicians in _allowed_clinician_ids()."""
+    return User.objects.filter(id__in=_allowed_clinician_ids(request, patient))
 
 
 @login_required
@@ -1004,7 +1215,8 @@ def portal_rx_list(request):
 
     q = (request.GET.get("q") or "").strip()
 
-    qs = Prescription.objects.filter(patient=patient).order_by("-created_at", "-id")
+    # the list prints each prescriber's name; join them instead of one query per row
+    qs = Prescription.objects.filter(patient=patient).select_related("clinician").order_by("-created_at", "-id")
     if q:
         qs = qs.filter(Q(title__icontains=q) | Q(body__icontains=q))
 
@@ -1047,6 +1259,120 @@ def portal_rx_detail(request, rx_id: int):
 
 
 
+# anything but letters, digits, "_", " " and "-" is dropped from download names
+_UNSAFE_FILENAME_CHARS = re.compile(r"[^\w \-]")
+
+
+def _safe_filename(name: str) -> str:
+    return _UNSAFE_FILENAME_CHARS.sub("", name).strip()
+
+
+# Rendered PDFs of *final* prescriptions are reused briefly, so repeat
+# downloads skip the ReportLab build. This does put prescription text and
+# the patient's name in the shared cache, unlike DM bubbles (which are
+# cheap to render); the short TTL bounds how long it stays there, and
+# drafts are never cached.
+_RX_PDF_TTL = 60 * 10
+
+
+@functools.cache
+def _static_logo_path():
+    # finders.find() walks every static dir; the answer is fixed per process
+    return finders.find("img/logo.png")
+
+
+@functools.cache
+def _rx_pdf_styles():
+    """
+    Paragraph and table styles for _rx_pdf_bytes, built once per process.
+    ReportLab stays an optional import: this raises ImportError without it.
+    """
+    from reportlab.lib import colors
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.platypus import TableStyle
+
+    styles = getSampleStyleSheet()
+    H1 = ParagraphStyle("H1", parent=styles["Heading1"], fontSize=16, leading=20, spaceAfter=6)
+    Meta = ParagraphStyle("Meta", parent=styles["Normal"], fontSize=9.5, textColor=colors.HexColor("#475569"))
+    Body = ParagraphStyle("Body", parent=styles["Normal"], fontSize=11.5, leading=16)
+    Box  = ParagraphStyle("Box",  parent=styles["Normal"], backColor=colors.HexColor("#f8fafc"),
+                          borderColor=colors.HexColor("#e5e7eb"), borderWidth=1, borderPadding=8,
+                          fontSize=11.5, leading=16)
+    Pill = ParagraphStyle("Pill", parent=styles["Normal"], textColor=colors.white,
+                          backColor=colors.HexColor("#059669"), fontName="Helvetica-Bold",
+                          fontSize=9, leading=12, alignment=1)
+    header_style = TableStyle([("VALIGN", (0,0), (-1,-1), "MIDDLE")])
+    pill_style = TableStyle([
+        ("LEFTPADDING", (0,0), (-1,-1), 8),
+        ("RIGHTPADDING", (0,0), (-1,-1), 8),
+        ("TOPPADDING", (0,0), (-1,-1), 4),
+        ("BOTTOMPADDING", (0,0), (-1,-1), 4),
+        ("BACKGROUND", (0,0), (-1,-1), colors.HexColor("#059669")),
+        ("TEXTCOLOR", (0,0), (-1,-1), colors.white),
+    ])
+    grid_style = TableStyle([("VALIGN", (0,0), (-1,-1), "TOP")])
+    return H1, Meta, Body, Box, Pill, header_style, pill_style, grid_style
+
+
+def _rx_pdf_bytes(*, title, body, patient_name, clinician_name, created) -> bytes:
+    """Render a prescription to PDF with ReportLab (raises if unavailable)."""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Table
+
+    H1, Meta, Body, Box, Pill, header_style, pill_style, grid_style = _rx_pdf_styles()
+
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(
+        buffer, pagesize=A4,
+        leftMargin=36, rightMargin=36, topMargin=36, bottomMargin=36
+    )
+
+    story = []
+
+    # Header with logo + title
+    logo_path = _static_logo_path()
+    row = []
+    if logo_path:
+        row.append(Image(logo_path, width=28, height=28))
+    else:
+        row.append(Paragraph("<b>N</b>", H1))
+    row.append(Paragraph("Nouvel — Prescription", H1))
+    header = Table([row], colWidths=[32, 450])
+    header.setStyle(header_style)
+    story.append(header)
+
+    story.append(Paragraph(f"Generated {created.strftime('%Y-%m-%d %H:%M')}", Meta))
+    story.append(Spacer(1, 6))
+
+    pill_tbl = Table([[Paragraph("Prescription", Pill)]])
+    pill_tbl.setStyle(pill_style)
+    story.append(pill_tbl)
+    story.append(Spacer(1, 10))
+
+    details = [
+        [Paragraph("<b>Patient:</b> " + patient_name, Body),
+         Paragraph("<b>Clinician:</b> " + clinician_name, Body)],
+        [Paragraph("<b>Title:</b> " + title, Body),
+         Paragraph("<b>Date:</b> " + created.strftime("%a, %b %d %Y · %H:%M"), Body)],
+    ]
+    grid = Table(details, colWidths=["*","*"])
+    grid.setStyle(grid_style)
+    story.append(grid)
+    story.append(Spacer(1, 12))
+
+    story.append(Paragraph("<b>Instructions / Medications</b>", Body))
+    story.append(Spacer(1, 4))
+    story.append(Paragraph((body or "").replace("\n", "<br/>"), Box))
+
+    story.append(Spacer(1, 18))
+    story.append(Paragraph(f"© {created.strftime('%Y')} Nouvel — This document was generated electronically.", Meta))
+
+    doc.build(story)
+    pdf = buffer.getvalue()
+    buffer.close()
+    return pdf
+
+
 @login_required
 def portal_rx_download(request, rx_id: int):
     if Prescription is None:
@@ -1070,82 +1396,28 @@ def portal_rx_download(request, rx_id: int):
         or "Clinician"
     )
     created = getattr(rx, "created_at", None) or timezone.now()
-    filename = "".join(c for c in title if c.isalnum() or c in (" ", "-", "_")).strip() or f"prescription-{rx.id}"
+    filename = _safe_filename(title) or f"prescription-{rx.id}"
+    patient_name = getattr(patient, "get_full_name", lambda: "")() or str(patient)
 
     # ---------- 1) Prefer ReportLab (pure Python, no native deps) ----------
     try:
-        from reportlab.lib.pagesizes import A4
-        from reportlab.lib import colors
-        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Table, TableStyle
-
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(
-            buffer, pagesize=A4,
-            leftMargin=36, rightMargin=36, topMargin=36, bottomMargin=36
-        )
-
-        styles = getSampleStyleSheet()
-        H1 = ParagraphStyle("H1", parent=styles["Heading1"], fontSize=16, leading=20, spaceAfter=6)
-        Meta = ParagraphStyle("Meta", parent=styles["Normal"], fontSize=9.5, textColor=colors.HexColor("#475569"))
-        Body = ParagraphStyle("Body", parent=styles["Normal"], fontSize=11.5, leading=16)
-        Box  = ParagraphStyle("Box",  parent=styles["Normal"], backColor=colors.HexColor("#f8fafc"),
-                              borderColor=colors.HexColor("#e5e7eb"), borderWidth=1, borderPadding=8,
-                              fontSize=11.5, leading=16)
-        Pill = ParagraphStyle("Pill", parent=styles["Normal"], textColor=colors.white,
-                              backColor=colors.HexColor("#059669"), fontName="Helvetica-Bold",
-                              fontSize=9, leading=12, alignment=1)
-
-        story = []
-
-        # Header with logo + title
-        logo_path = finders.find("img/logo.png")
-        row = []
-        if logo_path:
-            row.append(Image(logo_path, width=28, height=28))
+        def build_pdf():
+            return _rx_pdf_bytes(
+                title=title,
+                body=body,
+                patient_name=patient_name,
+                clinician_name=clinician_name,
+                created=created,
+            )
+
+        if getattr(rx, "status", "") == "final":
+            # Key on everything the PDF prints, so renaming the patient or
+            # clinician (which doesn't touch rx.updated_at) renders afresh.
+            inputs = "\x1f".join((title, body or "", patient_name, clinician_name, created.isoformat()))
+            digest = hashlib.sha256(inputs.encode()).hexdigest()
+            pdf = cache.get_or_set(f"portal:rx_pdf:{rx.id}:{digest}", build_pdf, _RX_PDF_TTL)
         else:
-            row.append(Paragraph("<b>N</b>", H1))
-        row.append(Paragraph("Nouvel — Prescription", H1))
-        header = Table([row], colWidths=[32, 450])
-        header.setStyle(TableStyle([("VALIGN", (0,0), (-1,-1), "MIDDLE")]))
-        story.append(header)
-
-        story.append(Paragraph(f"Generated {created.strftime('%Y-%m-%d %H:%M')}", Meta))
-        story.append(Spacer(1, 6))
-
-        pill_tbl = Table([[Paragraph("Prescription", Pill)]])
-        pill_tbl.setStyle(TableStyle([
-            ("LEFTPADDING", (0,0), (-1,-1), 8),
-            ("RIGHTPADDING", (0,0), (-1,-1), 8),
-            ("TOPPADDING", (0,0), (-1,-1), 4),
-            ("BOTTOMPADDING", (0,0), (-1,-1), 4),
-            ("BACKGROUND", (0,0), (-1,-1), colors.HexColor("#059669")),
-            ("TEXTCOLOR", (0,0), (-1,-1), colors.white),
-        ]))
-        story.append(pill_tbl)
-        story.append(Spacer(1, 10))
-
-        details = [
-            [Paragraph("<b>Patient:</b> " + (getattr(patient, "get_full_name", lambda: "")() or str(patient)), Body),
-             Paragraph("<b>Clinician:</b> " + clinician_name, Body)],
-            [Paragraph("<b>Title:</b> " + title, Body),
-             Paragraph("<b>Date:</b> " + created.strftime("%a, %b %d %Y · %H:%M"), Body)],
-        ]
-        grid = Table(details, colWidths=["*","*"])
-        grid.setStyle(TableStyle([("VALIGN", (0,0), (-1,-1), "TOP")]))
-        story.append(grid)
-        story.append(Spacer(1, 12))
-
-        story.append(Paragraph("<b>Instructions / Medications</b>", Body))
-        story.append(Spacer(1, 4))
-        story.append(Paragraph((body or "").replace("\n", "<br/>"), Box))
-
-        story.append(Spacer(1, 18))
-        story.append(Paragraph(f"© {created.strftime('%Y')} Nouvel — This document was generated electronically.", Meta))
-
-        doc.build(story)
-        pdf = buffer.getvalue()
-        buffer.close()
+            pdf = build_pdf()
 
         resp = HttpResponse(pdf, content_type="application/pdf")
         resp["Content-Disposition"] = f'attachment; filename="{filename}.pdf"'
@@ -1207,10 +1479,9 @@ def _portal_current_patient(user):
         pass
     # Try by email
     try:
-        from apps.patients.models import Patient
         email = (user.email or "").strip().lower()
         if email:
-            return Patient.objects.filter(email__iexact=email).first()
+            return Patient.objects.filter(email=email).first()
     except Exception:
         pass
     return None
@@ -1230,7 +1501,9 @@ def docs_list(request):
         storage_name = getattr(getattr(d, "file", None), "name", "") or ""
         display_name = basename(storage_name) if storage_name else (getattr(d, "title", "") or "Document")
         d.display_name = display_name
-        d.filesize = getattr(getattr(d, "file", None), "size", None)
+        # size_bytes is stored on save; file.size would stat the storage
+        # backend (a HEAD request on S3) for every row
+        d.filesize = getattr(d, "size_bytes", None) or None
         docs.append(d)
 
     return render(
@@ -1258,6 +1531,13 @@ def doc_detail(request, doc_id: int):
     )
 
 
+class _DocumentFileResponse(FileResponse):
+    # Scans and PDFs run to several MB; 64 KiB reads instead of the 4 KiB
+    # default cut the read calls (and storage round trips on remote
+    # backends) by 16x.
+    block_size = 64 * 1024
+
+
 @login_required
 def doc_download(request, doc_id: int):
     """Stream the original file to the patient (download)."""
@@ -1275,8 +1555,8 @@ def doc_download(request, doc_id: int):
 
     # Friendly filename
     base = getattr(doc, "filename", "") or getattr(doc, "title", "") or f"document-{doc.id}"
-    safe = "".join(c for c in base if c.isalnum() or c in (" ", "-", "_")).strip() or f"document-{doc.id}"
-    return FileResponse(f.open("rb"), as_attachment=True, filename=safe)
+    safe = _safe_filename(base) or f"document-{doc.id}"
+    return _DocumentFileResponse(f.open("rb"), as_attachment=True, filename=safe)
 
 
 @login_required
@@ -1300,7 +1580,7 @@ def docs_download(request, doc_id: int):
     storage_name = f.name
     fallback = basename(storage_name) if storage_name else "document"
     nice = title or fallback
-    safe = "".join(c for c in nice if c.isalnum() or c in (" ", "-", "_")).strip() or "document"
+    safe = _safe_filename(nice) or "document"
     filename = f"{safe}"
 
     # Guess content type
@@ -1309,10 +1589,14 @@ def docs_download(request, doc_id: int):
 
     # Use the underlying file; storage ensures streaming
     fileobj = f.open("rb")
-    resp = FileResponse(fileobj, content_type=ctype, as_attachment=True, filename=filename)
+    resp = _DocumentFileResponse(fileobj, content_type=ctype, as_attachment=True, filename=filename)
     return resp
 
 
+# file extensions the document modal previews inline as an <img>
+_PREVIEW_IMAGE_EXTS = frozenset({".png", ".jpg", ".jpeg", ".gif", ".webp", ".bmp"})
+
+
 @login_required
 def docs_view_modal(request, doc_id: int):
     """
@@ -1333,9 +1617,9 @@ def docs_view_modal(request, doc_id: int):
             or (getattr(doc, "file", None) and doc.file.name) or "Document"
 
     name = (getattr(doc, "file", None) and doc.file.name.lower()) or ""
-    ext = name.rsplit(".", 1)[-1] if "." in name else ""
-    is_pdf = ext == "pdf"
-    is_image = ext in {"png", "jpg", "jpeg", "gif", "webp", "bmp"}
+    ext = splitext(name)[1]
+    is_pdf = ext == ".pdf"
+    is_image = ext in _PREVIEW_IMAGE_EXTS
 
     ctx = {
         "title": title,
@@ -1395,57 +1679,19 @@ def portal_tests_list(request: HttpRequest):
     return render(request, "portal/tests/list.html", ctx)
 
 
-
-
-@login_required
-def portal_tests_panel(request):
-    """
-    Patient dashboard panel — recent lab reports & orders.
-    Uses the same patient resolver as the Tests page.
-    """
-    # Reuse the helper your portal already uses for patient scoping
-    try:
-        patient = _current_patient_for_user(request.user)  # this exists in your portal views
-    except NameError:
-        # Fallback if helper isn't available for some reason
-        patient = getattr(request.user, "patient_profile", None)
-
-    if not patient:
-        return render(request, "portal/panels/tests_panel.html", {"reports": [], "orders": []})
-
-    
-    reports_qs = (
-        DiagnosticReport.objects
-        .filter(patient=patient)
-        .prefetch_related(
-            Prefetch("observations", queryset=Observation.objects.order_by("id")),
-        )
-        .order_by("-issued_at", "-id")[:5]
-    )
-
-    orders_qs = (
-        LabOrder.objects
-        .filter(patient=patient)
-        .select_related("catalog")
-        .order_by("-ordered_at", "-id")[:5]
-    )
-
-    return render(
-        request,
-        "portal/panels/tests_panel.html",
-        {"reports": reports_qs, "orders": orders_qs}
-    )
-
-
 def _patient_for(request):
-    
     try:
         return _current_patient_for_user(request.user)
     except NameError:
         return getattr(request.user, "patient_profile", None)
 
+
 @login_required
 def portal_tests_panel(request):
+    """
+    Patient dashboard panel — recent lab reports & orders.
+    Uses the same patient resolver as the Tests page.
+    """
     patient = _patient_for(request)
     if not patient:
         return render(request, "portal/panels/tests_panel.html", {"reports": [], "orders": [], "tab": "orders"})
@@ -1455,7 +1701,9 @@ def portal_tests_panel(request):
     reports_qs = (
         DiagnosticReport.objects
         .filter(patient=patient)
-        .prefetch_related("observations")   
+        .prefetch_related(
+            Prefetch("observations", queryset=Observation.objects.order_by("id")),
+        )
         .order_by("-issued_at", "-id")[:5]
     )
     orders_qs = (
@@ -1501,13 +1749,6 @@ def portal_tests_report_detail(request, report_id: int):
 
     return render(request, "portal/tests/report_detail_modal.html", {"r": report, "obs": obs})
 
-def _patient_for(request):
-    try:
-        return _current_patient_for_user(request.user)
-    except NameError:
-        return getattr(request.user, "patient_profile", None)
-
-
 def portal_my_results_list(request):
     patient = _patient_for(request)
     if not patient:
@@ -2,6 +2,9 @@
 from django import template
 from django.urls import reverse, NoReverseMatch
 
+from apps.rbac.permissions import _norm
+from apps.rbac.utils import user_roles
+
 register = template.Library()
 
 @register.filter
@@ -11,14 +14,9 @@ def in_roles(user, roles_csv: str) -> bool:
     """
     if not getattr(user, "is_authenticated", False):
         return False
-    want = {r.strip() for r in roles_csv.split(",") if r.strip()}
-    try:
-        have = set(
-            user.role_bindings.select_related("role").values_list("role__name", flat=True)
-        )
-    except Exception:
-        have = set()
-    return bool(have & want)
+    want = {_norm(r) for r in roles_csv.split(",") if r.strip()}
+    # Shares the per-request role cache with has_role()
+    return bool(user_roles(user) & want)
 
 @register.simple_tag(takes_context=True)
 def absurl(context, view_name, *args, **kwargs):
@@ -9,20 +9,36 @@ from django.shortcuts import redirect
 from apps.rbac.permissions import _norm
 
 
+_ROLE_CACHE_ATTR = "_rbac_role_set"
+
+
 def user_roles(user) -> Set[str]:
     """
     Return a normalized set of role names bound to the user.
     Mirrors the logic used in DRF permission class HasRole.
+
+    The set is cached on the user instance, so repeated gate checks within
+    one request (request.user is loaded once per request) cost one query.
     """
     if not getattr(user, "is_authenticated", False):
-        return set()
+        return frozenset()
+
+    cached = getattr(user, _ROLE_CACHE_ATTR, None)
+    if cached is not None:
+        return cached
 
     try:
         # Assuming a reverse relation: user.role_bindings -> RoleBinding
-        qs = user.role_bindings.select_related("role").values_list("role__name", flat=True)
-        return {_norm(r) for r in qs}
+        qs = user.role_bindings.values_list("role__name", flat=True)
+        roles = frozenset(_norm(r) for r in qs)
+    except Exception:
+        roles = frozenset()
+
+    try:
+        setattr(user, _ROLE_CACHE_ATTR, roles)
     except Exception:
-        return set()
+        pass
+    return roles
 
 
 def has_role(user, *roles: Iterable[str], allow_superuser: bool = True) -> bool:
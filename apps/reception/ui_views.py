@@ -1,10 +1,12 @@
 # apps/reception/ui_views.py
+import functools
 from datetime import datetime, timedelta
 
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.core.mail import send_mail
 from django.core.paginator import Paginator
+from django.db import transaction
 from django.db.models import Q, Count
 from django.http import HttpResponse, JsonResponse, HttpResponseBadRequest, HttpResponseForbidden
 from django.shortcuts import render, redirect, get_object_or_404
@@ -59,25 +61,24 @@ def _clinician_qs():
 
 # ---------------- Patients (support with/without Patient.user) --------------
 
-def _patient_has_user_fk() -> bool:
+@functools.cache
+def _model_fields(model) -> frozenset[str]:
+    # Model fields don't change at runtime; walk _meta once per model.
     try:
-        return any(f.name == "user" for f in Patient._meta.get_fields())
+        return frozenset(f.name for f in model._meta.get_fields())
     except Exception:
-        return False
+        return frozenset()
+
+def _patient_has_user_fk() -> bool:
+    return "user" in _model_fields(Patient)
 
 _HAS_USER = _patient_has_user_fk()
 
-def _patient_fields() -> set[str]:
-    try:
-        return {f.name for f in Patient._meta.get_fields()}
-    except Exception:
-        return set()
+def _patient_fields() -> frozenset[str]:
+    return _model_fields(Patient)
 
 def _model_has_field(model, name: str) -> bool:
-    try:
-        return any(f.name == name for f in model._meta.get_fields())
-    except Exception:
-        return False
+    return name in _model_fields(model)
 
 def patient_queryset():
     qs = Patient.objects.all()
@@ -574,18 +575,20 @@ def reception_book_create(request):
     }
     ser = AppointmentCreateSerializer(data=payload)
     ser.is_valid(raise_exception=True)
-    appt = ser.save()
+    with transaction.atomic():
+        appt = ser.save()
+
+        # Persist who booked it (so lists can show "Booked by Reception: <name>")
+        if hasattr(appt, "created_by_id"):
+            appt.created_by = request.user
+            appt.save(update_fields=["created_by"])
 
-    # Persist who booked it (so lists can show "Booked by Reception: <name>")
-    if hasattr(appt, "created_by_id"):
-        appt.created_by = request.user
-        appt.save(update_fields=["created_by"])
+        # Enqueue only once the row is committed; broker errors are logged.
+        transaction.on_commit(
+            functools.partial(send_appointment_email.delay, appt.id, "created"), robust=True
+        )
 
     log_event(request, "appt.create.reception", "Appointment", appt.id)
-    try:
-        send_appointment_email.delay(appt.id, "created")
-    except Exception:
-        pass
 
     msg = f'Booked {timezone.localtime(start):%a %b %d · %H:%M}.'
     resp = HttpResponse(f'<div class="text-emerald-700 text-sm">{msg}</div>')
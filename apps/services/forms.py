@@ -1,3 +1,5 @@
+import functools
+
 from django import forms
 from django.forms import inlineformset_factory
 from .models import Service, ServiceSection, ServiceCategory  # adjust import paths if different
@@ -6,8 +8,14 @@ from .models import Service, ServiceSection, ServiceCategory  # adjust import pa
 _BASE_INPUT = "w-full rounded-2xl border border-white/40 bg-white/60 px-3 py-2.5"
 _TEXTAREA   = _BASE_INPUT + " min-h-[10rem]"
 
+@functools.cache
+def _field_names(model_cls) -> frozenset[str]:
+    # fixed per model; forms are built on every request
+    return frozenset(f.name for f in model_cls._meta.get_fields())
+
+
 def _first_existing(model_cls, candidates):
-    names = {f.name for f in model_cls._meta.get_fields()}
+    names = _field_names(model_cls)
     for c in candidates:
         if c in names:
             return c
@@ -1,4 +1,6 @@
 # apps/services/views.py
+import functools
+
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.db import transaction
@@ -17,7 +19,9 @@ def is_staff_or_superuser(user):
     return user.is_authenticated and (user.is_staff or user.is_superuser)
 
 
+@functools.cache
 def _has_field(model_cls, field_name: str) -> bool:
+    # fixed per model; probed several times per request, misses via exception
     try:
         model_cls._meta.get_field(field_name)
         return True
@@ -60,6 +64,7 @@ def recent_services(limit=6):
     return _public_qs()[:limit]
 
 
+@functools.cache
 def _service_form():
     """
     Build a ModelForm for Service that includes all editable concrete fields,
@@ -102,6 +102,20 @@ TEMPLATES = [
 DATABASES = {
     "default": env.db("DATABASE_URL", default=f"sqlite:///{BASE_DIR / 'db.sqlite3'}"),
 }
+# Reuse connections across requests instead of reconnecting per request.
+DATABASES["default"]["CONN_MAX_AGE"] = env.int("DB_CONN_MAX_AGE", default=600)
+DATABASES["default"]["CONN_HEALTH_CHECKS"] = env.bool("DB_CONN_HEALTH_CHECKS", default=True)
+# Behind pgbouncer in transaction-pooling mode server-side cursors must be off.
+if env.bool("DB_USE_PGBOUNCER", default=False):
+    DATABASES["default"]["DISABLE_SERVER_SIDE_CURSORS"] = True
+# Optional streaming replica for hot, lag-tolerant reads (portal badge/inbox).
+# Same connection settings as default; tests mirror it onto default.
+if env.str("DATABASE_REPLICA_URL", default=""):
+    DATABASES["replica"] = env.db("DATABASE_REPLICA_URL")
+    for _key in ("CONN_MAX_AGE", "CONN_HEALTH_CHECKS", "DISABLE_SERVER_SIDE_CURSORS"):
+        if _key in DATABASES["default"]:
+            DATABASES["replica"][_key] = DATABASES["default"][_key]
+    DATABASES["replica"]["TEST"] = {"MIRROR": "default"}
 
 # --- auth / i18n / tz --------------------------------------------------------
 AUTH_USER_MODEL = "accounts.User"
@@ -110,6 +124,10 @@ TIME_ZONE = env.str("DJANGO_TIME_ZONE", default="Europe/Paris")
 USE_I18N = True
 USE_TZ = True
 
+# Public origin used for absolute links in emails (e.g. "https://app.nouvel.health").
+# Empty = derive scheme/host from the current request.
+SITE_BASE_URL = env.str("SITE_BASE_URL", default="").rstrip("/")
+
 # Login/Logout redirects
 LOGIN_URL = "/login/"
 LOGIN_REDIRECT_URL = "/portal/"
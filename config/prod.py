@@ -22,9 +22,23 @@ CSRF_TRUSTED_ORIGINS = env.list(
 DATABASES = {
     "default": dj_database_url.parse(
         env("DATABASE_URL", default="postgres://nouvel:nouvel@db:5432/nouvel"),
-        conn_max_age=600,
+        conn_max_age=env.int("DB_CONN_MAX_AGE", default=600),
+        conn_health_checks=env.bool("DB_CONN_HEALTH_CHECKS", default=True),
     )
 }
+if env.bool("DB_USE_PGBOUNCER", default=False):
+    DATABASES["default"]["DISABLE_SERVER_SIDE_CURSORS"] = True
+# Optional streaming replica for hot, lag-tolerant reads (portal badge/inbox).
+if env("DATABASE_REPLICA_URL", default=""):
+    DATABASES["replica"] = dj_database_url.parse(
+        env("DATABASE_REPLICA_URL"),
+        conn_max_age=env.int("DB_CONN_MAX_AGE", default=600),
+        conn_health_checks=env.bool("DB_CONN_HEALTH_CHECKS", default=True),
+    )
+    DATABASES["replica"]["DISABLE_SERVER_SIDE_CURSORS"] = DATABASES["default"].get(
+        "DISABLE_SERVER_SIDE_CURSORS", False
+    )
+    DATABASES["replica"]["TEST"] = {"MIRROR": "default"}
 
 CELERY_BROKER_URL = env(
     "CELERY_BROKER_URL",